@@ -6,6 +6,7 @@ import pandas as pd
 import sqlite3
 import os
 import tempfile
+import shutil
 from datetime import datetime
 from offline_processor import is_cqe_file, process_single_cqe_file, create_team_sheets_email_html
 
@@ -138,7 +139,9 @@ if page == "📥 Import Bugs":
     
     if uploaded_file:
         with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp:
-            tmp.write(uploaded_file.getvalue())
+            # Copy in 1 MB chunks rather than duplicating the whole upload in memory
+            uploaded_file.seek(0)
+            shutil.copyfileobj(uploaded_file, tmp, length=1024 * 1024)
             temp_path = tmp.name
         
         try:
@@ -151,18 +154,10 @@ if page == "📥 Import Bugs":
                         
                         if output_file and os.path.exists(output_file):
                             # Read data
-                            import openpyxl
-                            wb = openpyxl.load_workbook(output_file)
-                            sheet = wb['Daily New']
-                            
-                            data = []
-                            headers = [cell.value for cell in sheet[1]]
-                            for row in sheet.iter_rows(min_row=2, values_only=True):
-                                if any(row):
-                                    data.append(row)
-                            
-                            df = pd.DataFrame(data, columns=headers)
-                            wb.close()
+                            # Object dtype keeps cell values as written; empty cells become None as before
+                            df = pd.read_excel(output_file, sheet_name='Daily New', engine='openpyxl', dtype=object)
+                            df = df.dropna(how='all')
+                            df = df.where(df.notna(), None)
                             
                             # Save to database
                             new_bugs, updated_bugs = save_bugs(df)
@@ -262,11 +257,11 @@ elif page == "📅 History":
     days = st.slider("Days back", 1, 30, 7)
     
     conn = sqlite3.connect(DB_FILE)
-    history = pd.read_sql_query(f'''
+    history = pd.read_sql_query('''
         SELECT * FROM import_history 
-        WHERE import_date >= date('now', '-{days} days')
+        WHERE import_date >= date('now', ?)
         ORDER BY import_date DESC
-    ''', conn)
+    ''', conn, params=(f'-{int(days)} days',))
     conn.close()
     
     if not history.empty:
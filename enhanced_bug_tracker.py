@@ -8,6 +8,7 @@ import pandas as pd
 import sqlite3
 import os
 import tempfile
+import shutil
 from datetime import datetime, timedelta
 from offline_processor import (
     is_cqe_file, 
@@ -159,7 +160,9 @@ if page == "📥 Import Bugs":
     
     if uploaded_file:
         with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp:
-            tmp.write(uploaded_file.getvalue())
+            # Copy in 1 MB chunks rather than duplicating the whole upload in memory
+            uploaded_file.seek(0)
+            shutil.copyfileobj(uploaded_file, tmp, length=1024 * 1024)
             temp_path = tmp.name
         
         try:
@@ -172,19 +175,10 @@ if page == "📥 Import Bugs":
                         
                         if output_file and os.path.exists(output_file):
                             # Read processed data
-                            import openpyxl
-                            wb = openpyxl.load_workbook(output_file)
-                            sheet = wb['Daily New']
-                            
-                            # Convert to DataFrame
-                            data = []
-                            headers = [cell.value for cell in sheet[1]]
-                            for row in sheet.iter_rows(min_row=2, values_only=True):
-                                if any(row):
-                                    data.append(row)
-                            
-                            df = pd.DataFrame(data, columns=headers)
-                            wb.close()
+                            # Object dtype keeps cell values as written; empty cells become None as before
+                            df = pd.read_excel(output_file, sheet_name='Daily New', engine='openpyxl', dtype=object)
+                            df = df.dropna(how='all')
+                            df = df.where(df.notna(), None)
                             
                             # Save to database
                             new_bugs, updated_bugs = save_bugs_to_db(df)
@@ -324,9 +318,9 @@ elif page == "📅 History":
     conn = sqlite3.connect(DB_FILE)
     history_df = pd.read_sql_query('''
         SELECT * FROM import_history 
-        WHERE import_date >= date('now', '-{} days')
+        WHERE import_date >= date('now', ?)
         ORDER BY import_date DESC
-    '''.format(days_back), conn)
+    ''', conn, params=(f'-{int(days_back)} days',))
     conn.close()
     
     if not history_df.empty:
@@ -7,8 +7,10 @@ Run the bug assignment operations on manually downloaded Excel files
 import os
 import sys
 import logging
+import re
 from datetime import datetime
 from script import CQEToOursNewest
+import numpy as np
 import pandas as pd
 
 # Configure logging
@@ -18,16 +20,81 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Failure Mode keyword rules, checked in order of priority (first group wins)
+FAILURE_MODE_RULES = [
+    (['OVERT'], 'Thermal'),
+    (['SLD', 'POWER'], 'Power'),
+    (['L2', 'CACHE', 'RMINIT'], 'SRAM Memory'),
+    (['REMAP'], 'HBM Memory'),
+    (['ECC', 'UEC', ' CE ', 'DATA MISMATCH', 'CRC', 'DATA/BUFFER'], 'General Memory (SRAM or HBM)'),
+    (['SUDDEN DEATH', 'SDC', 'THERMAL'], 'Thermal'),
+    (['XID'], 'Customer ID Specific Issue'),
+    (['FALLING OFF'], 'GPU Falling Off Bus'),
+    (['DEVICE INTERRUPT', 'INTERRUPT', 'IST'], 'Unknown Cause Issue'),
+    (['PCIE'], 'Potential Memory or NVSpec Issues'),
+]
+
+# Keyword -> (rule priority, Failure Mode)
+FAILURE_MODE_KEYWORDS = {
+    keyword: (priority, failure_mode)
+    for priority, (keywords, failure_mode) in enumerate(FAILURE_MODE_RULES)
+    for keyword in keywords
+}
+
+# Every Failure Mode the rules can produce, used as the categorical dtype
+FAILURE_MODE_CATEGORIES = list(dict.fromkeys(failure_mode for _, failure_mode in FAILURE_MODE_RULES))
+
+# Single pattern matching every keyword; the lookahead reports overlapping hits
+# so one scan per title finds all matching rules
+FAILURE_MODE_PATTERN = re.compile(
+    '(?=(' + '|'.join(re.escape(keyword) for keyword in FAILURE_MODE_KEYWORDS) + '))'
+)
+
+# <sheet name="..."> entries in an xlsx archive's xl/workbook.xml
+SHEET_NAME_PATTERN = re.compile(rb'<(?:\w+:)?sheet\b[^>]*?\bname="([^"]*)"')
+
+# Static markup of the team sheets email report, built once at import; only the
+# report timestamp is filled in per report
+EMAIL_HTML_HEAD = """
+    <html>
+    <head>
+        <style>
+            body {{ font-family: Arial, sans-serif; }}
+            h1 {{ color: #333; }}
+            h2 {{ color: #666; margin-top: 30px; }}
+            table {{ border-collapse: collapse; margin-bottom: 30px; width: 100%; }}
+            th {{ background-color: #4CAF50; color: white; padding: 12px; text-align: left; }}
+            td {{ border: 1px solid #ddd; padding: 8px; }}
+            tr:nth-child(even) {{ background-color: #f2f2f2; }}
+            .summary {{ background-color: #e7f3ff; padding: 15px; margin-bottom: 20px; border-radius: 5px; }}
+        </style>
+    </head>
+    <body>
+        <h1>Daily Bug Assignment Report - {timestamp}</h1>
+        <div class="summary">
+            <strong>Summary:</strong><br>
+    """
+EMAIL_HTML_TAIL = """
+    </body>
+    </html>
+    """
+
 
 def is_cqe_file(excel_path):
     """
     Check if the given Excel file is a CQE bugs file (doesn't have our required sheets)
+    
+    Args:
+        excel_path: Path to the workbook, or a seekable binary file object holding it
     """
     try:
-        import openpyxl
-        wb = openpyxl.load_workbook(excel_path, read_only=True)
-        sheet_names = wb.sheetnames
-        wb.close()
+        # Sheet names live in xl/workbook.xml, so read just that part of the
+        # xlsx archive and pull the names out without parsing the XML
+        import html
+        import zipfile
+        with zipfile.ZipFile(excel_path) as archive:
+            workbook_xml = archive.read('xl/workbook.xml')
+        sheet_names = [html.unescape(name.decode('utf-8')) for name in SHEET_NAME_PATTERN.findall(workbook_xml)]
         
         # Check if it has our required sheets
         required_sheets = ['Daily New', 'GL', 'NT', 'PP']
@@ -42,9 +109,19 @@ def is_cqe_file(excel_path):
         return True  # Assume it's a CQE file if we can't read it properly
 
 
-def process_single_cqe_file(cqe_file_path):
+def process_single_cqe_file(cqe_file_path, save_target=None, return_details=False):
     """
     Process a single CQE file by creating a proper structure and importing data from first tab only
+    
+    Args:
+        cqe_file_path: Path to the CQE workbook
+        save_target: Optional path or writable binary file (e.g. io.BytesIO) to save the
+            processed workbook to instead of processed_<timestamp>_<name>.xlsx in the
+            working directory. The generated file name is still returned either way.
+        return_details: Return (output_file, details) instead of just output_file, where
+            details holds 'team_counts' (bugs written to each team sheet) and
+            'html_report' (the HTML report built from the in-memory team data);
+            (None, None) on failure
     """
     logger.info(f"Processing CQE file: {cqe_file_path}")
     
@@ -53,25 +130,6 @@ def process_single_cqe_file(cqe_file_path):
     base_name = os.path.splitext(os.path.basename(cqe_file_path))[0]
     output_file = f"processed_{timestamp}_{base_name}.xlsx"
     
-    # Step 1: Read ONLY the first sheet of CQE data
-    logger.info("Reading CQE data from first sheet only...")
-    try:
-        # Get sheet names first
-        excel_file = pd.ExcelFile(cqe_file_path)
-        first_sheet_name = excel_file.sheet_names[0]
-        logger.info(f"Reading from sheet: '{first_sheet_name}'")
-        
-        # Read only the first sheet
-        cqe_data = pd.read_excel(cqe_file_path, sheet_name=0)
-        logger.info(f"Found {len(cqe_data)} rows in first sheet")
-        logger.info(f"Columns: {', '.join(cqe_data.columns.tolist())}")
-    except Exception as e:
-        logger.error(f"Error reading CQE file: {e}")
-        return None
-    
-    # Step 2: Map CQE columns to our format
-    logger.info("Mapping CQE columns to standard format...")
-    
     # Define column mapping based on user requirements
     column_mapping = {
         'SXM SN for SXM RMA': 'SN Associated',
@@ -83,175 +141,126 @@ def process_single_cqe_file(cqe_file_path):
         'Product': 'Product'
     }
     
-    # Create a new DataFrame with mapped columns
-    mapped_data = pd.DataFrame()
+    # Column order of our template - now including Product as rightmost
+    column_order = ['Assignment', 'Bug ID', 'Priority', 'Title', 'Failure Mode', 
+                    'Created Date', 'COMPLETED', 'SN Associated', 'Product']
+    
+    # Step 1: Read ONLY the first sheet of CQE data
+    logger.info("Reading CQE data from first sheet only...")
+    try:
+        # Open the workbook once and reuse it for sheet discovery and the data read.
+        # pandas' openpyxl engine already loads it with read_only=True and data_only=True
+        with pd.ExcelFile(cqe_file_path, engine='openpyxl') as excel_file:
+            first_sheet_name = excel_file.sheet_names[0]
+            logger.info(f"Reading from sheet: '{first_sheet_name}'")
+            
+            # Read only the first sheet, and only the columns we map
+            cqe_data = excel_file.parse(sheet_name=0, usecols=lambda col: col in column_mapping)
+        logger.info(f"Found {len(cqe_data)} rows in first sheet")
+        logger.info(f"Columns: {', '.join(cqe_data.columns.tolist())}")
+    except Exception as e:
+        logger.error(f"Error reading CQE file: {e}")
+        return (None, None) if return_details else None
+    
+    # Step 2: Map CQE columns to our format
+    logger.info("Mapping CQE columns to standard format...")
     
     # Map each column
+    mapped_columns = {}
     for cqe_col, new_col in column_mapping.items():
         if cqe_col in cqe_data.columns:
-            mapped_data[new_col] = cqe_data[cqe_col]
-            logger.info(f"Mapped '{cqe_col}' to '{new_col}'")
+            mapped_columns[new_col] = cqe_data[cqe_col]
+            logger.info("Mapped '%s' to '%s'", cqe_col, new_col)
         else:
-            logger.warning(f"Column '{cqe_col}' not found in CQE data")
-            mapped_data[new_col] = ''
+            logger.warning("Column '%s' not found in CQE data", cqe_col)
+            mapped_columns[new_col] = pd.Series('', index=cqe_data.index)
+    
+    # Add empty columns for missing fields
+    mapped_columns['Assignment'] = ''  # Empty Assignment column
+    mapped_columns['Failure Mode'] = ''  # Empty as requested
+    
+    # Create the mapped DataFrame in one go, already in template column order
+    mapped_data = pd.DataFrame(mapped_columns, columns=column_order)
     
     # Debug: Check Product column values
-    if 'Product' in mapped_data.columns:
-        logger.info(f"Product column values (first 10): {mapped_data['Product'].head(10).tolist()}")
+    if 'Product' in mapped_data.columns and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Product column values (first 10): %s", mapped_data['Product'].head(10).tolist())
     
     # Process Bug ID column - add https://nvbugs/ prefix if not present
     if 'Bug ID' in mapped_data.columns:
-        def format_bug_id(bug_id):
-            if pd.isna(bug_id) or str(bug_id).strip() == '':
-                return 'nvbug not provided for this bug.'
-            bug_id_str = str(bug_id).strip()
-            # Check if it already has the prefix
-            if bug_id_str.startswith('https://nvbugs/'):
-                return bug_id_str
-            # If it's just a number, add the prefix
-            return f'https://nvbugs/{bug_id_str}'
-        
-        mapped_data['Bug ID'] = mapped_data['Bug ID'].apply(format_bug_id)
+        # Normalize to stripped strings, then work on a fixed-width NumPy array
+        bug_ids = mapped_data['Bug ID'].astype('string').fillna('').str.strip().to_numpy(dtype=str)
+        missing = bug_ids == ''
+        # Keep values that already have the prefix, add it to plain bug numbers
+        has_prefix = np.char.startswith(bug_ids, 'https://nvbugs/')
+        mapped_data['Bug ID'] = np.where(
+            missing,
+            'nvbug not provided for this bug.',
+            np.where(has_prefix, bug_ids, np.char.add('https://nvbugs/', bug_ids))
+        )
         logger.info("Formatted Bug ID column with https://nvbugs/ prefix")
     
     # Convert SN Associated column to handle large numbers
     if 'SN Associated' in mapped_data.columns:
-        # Convert to numeric first to clean the data
-        mapped_data['SN Associated'] = pd.to_numeric(mapped_data['SN Associated'], errors='coerce')
-        # Fill NaN values with 0
-        mapped_data['SN Associated'] = mapped_data['SN Associated'].fillna(0)
+        # Convert to numeric first to clean the data, filling NaN values with 0
+        serial_numbers = pd.to_numeric(mapped_data['SN Associated'], errors='coerce').fillna(0).astype('int64')
         # Convert large numbers to integers then to string to preserve full number
         # This prevents scientific notation display
-        mapped_data['SN Associated'] = mapped_data['SN Associated'].apply(
-            lambda x: str(int(x)) if x != 0 and pd.notna(x) else ''
-        )
-    
-    # Add empty columns for missing fields
-    mapped_data['Assignment'] = ''  # Empty Assignment column
-    mapped_data['Failure Mode'] = ''  # Empty as requested
+        mapped_data['SN Associated'] = serial_numbers.astype('string').mask(serial_numbers == 0, '')
     
     # Map Failure Mode based on Title keywords
     if 'Title' in mapped_data.columns:
         logger.info("Mapping Failure Mode based on Title keywords...")
         
-        def map_failure_mode(title):
-            if pd.isna(title) or str(title).strip() == '':
+        # Uppercase every title once up front instead of per classifier call
+        titles_upper = mapped_data['Title'].fillna('').astype(str).str.upper()
+        
+        def map_failure_mode(title_upper):
+            if title_upper.strip() == '':
                 return 'Unknown Cause Issue'  # Changed from '' to 'Unknown Cause Issue' for blank titles
             
-            title_upper = str(title).upper()
-            
-            # Check keywords in order of priority
-            if 'OVERT' in title_upper:
-                return 'Thermal'
-            elif 'SLD' in title_upper or 'POWER' in title_upper:
-                return 'Power'
-            elif 'L2' in title_upper or 'CACHE' in title_upper or 'RMINIT' in title_upper:
-                return 'SRAM Memory'
-            elif 'REMAP' in title_upper:
-                return 'HBM Memory'
-            elif 'ECC' in title_upper or 'UEC' in title_upper or ' CE ' in title_upper or 'DATA MISMATCH' in title_upper or 'CRC' in title_upper or 'DATA/BUFFER' in title_upper:
-                return 'General Memory (SRAM or HBM)'
-            elif 'SUDDEN DEATH' in title_upper or 'SDC' in title_upper or 'THERMAL' in title_upper:
-                return 'Thermal'
-            elif 'XID' in title_upper:
-                return 'Customer ID Specific Issue'
-            elif 'FALLING OFF' in title_upper:
-                return 'GPU Falling Off Bus'
-            elif 'DEVICE INTERRUPT' in title_upper or 'INTERRUPT' in title_upper or 'IST' in title_upper:
-                return 'Unknown Cause Issue'
-            elif 'PCIE' in title_upper:
-                return 'Potential Memory or NVSpec Issues'
-            else:
+            # Scan the title once for every keyword and keep the highest-priority rule
+            hits = FAILURE_MODE_PATTERN.findall(title_upper)
+            if not hits:
                 return 'Unknown Cause Issue'  # Changed from '' to 'Unknown Cause Issue' for unmatched cases
+            return min(FAILURE_MODE_KEYWORDS[hit] for hit in hits)[1]
         
         # Apply the mapping
-        mapped_data['Failure Mode'] = mapped_data['Title'].apply(map_failure_mode)
+        mapped_data['Failure Mode'] = pd.Categorical(
+            titles_upper.map(map_failure_mode), categories=FAILURE_MODE_CATEGORIES
+        )
         
         # Log some examples
         failure_mode_counts = mapped_data['Failure Mode'].value_counts()
         logger.info("Failure Mode mapping results:")
         for mode, count in failure_mode_counts.items():
-            if mode:  # Only log non-empty modes
-                logger.info(f"  {mode}: {count} bugs")
+            if count:  # Only log modes that occur
+                logger.info("  %s: %d bugs", mode, count)
     
-    # Track rows that need black highlighting (non-SXM5 products) - BEFORE reordering columns
-    rows_to_highlight = []
+    # Track rows that need black highlighting (non-SXM5 products)
+    highlight_mask = np.zeros(len(mapped_data), dtype=bool)
     if 'Product' in mapped_data.columns:
         logger.info(f"Product column found, checking {len(mapped_data)} rows for highlighting...")
-        for idx, product in enumerate(mapped_data['Product']):
-            if pd.notna(product) and str(product).strip() != '':
-                product_str = str(product).strip()
-                # Check if "SXM5" is NOT in the product string
-                if 'SXM5' not in product_str:
-                    rows_to_highlight.append(idx)
-                    logger.info(f"Row {idx+2} will be highlighted (Product: {product_str})")
-            else:
-                # Empty product values should also be highlighted
-                rows_to_highlight.append(idx)
-                logger.debug(f"Row {idx+2} has empty/NaN Product value - will be highlighted")
+        products = mapped_data['Product'].astype('string').fillna('').str.strip()
+        # Empty product values and products without "SXM5" are highlighted
+        highlight_mask = ((products == '') | ~products.str.contains('SXM5', regex=False)).to_numpy()
+        logger.info("%d rows will be highlighted (non-SXM5 or empty Product)", highlight_mask.sum())
     else:
         logger.warning("Product column not found in mapped_data!")
-    
-    # Reorder columns to match our template - now including Product as rightmost
-    column_order = ['Assignment', 'Bug ID', 'Priority', 'Title', 'Failure Mode', 
-                    'Created Date', 'COMPLETED', 'SN Associated', 'Product']
-    
-    # Ensure all columns exist
-    for col in column_order:
-        if col not in mapped_data.columns:
-            mapped_data[col] = ''
-    
-    # Don't remove Product column anymore - keep it as rightmost column
-    # if 'Product' in mapped_data.columns:
-    #     del mapped_data['Product']
-    
-    mapped_data = mapped_data[column_order]
+    rows_to_highlight = np.flatnonzero(highlight_mask)
     
     # Process Priority column - fill blanks with sequential numbers
     if 'Priority' in mapped_data.columns:
-        priority_col = mapped_data['Priority'].copy()
-        
         # Convert to numeric, keeping NaN for blanks
-        priority_col = pd.to_numeric(priority_col, errors='coerce')
+        priority_col = pd.to_numeric(mapped_data['Priority'], errors='coerce').to_numpy(dtype=float)
         
-        # Fill blanks with sequential numbers
-        last_value = 0
-        for i in range(len(priority_col)):
-            if pd.notna(priority_col.iloc[i]):
-                # Found a non-blank value
-                current_value = int(priority_col.iloc[i])
-                if i > 0 and last_value > 0:
-                    # Fill the blanks between last_value and current_value
-                    blank_start = None
-                    for j in range(i-1, -1, -1):
-                        if pd.isna(priority_col.iloc[j]):
-                            blank_start = j
-                        else:
-                            break
-                    
-                    if blank_start is not None:
-                        # Fill sequential values
-                        num_blanks = i - blank_start
-                        if current_value > last_value + num_blanks:
-                            # Fill with sequential numbers
-                            for k, idx in enumerate(range(blank_start, i)):
-                                priority_col.iloc[idx] = last_value + k + 1
-                        else:
-                            # Just fill with incremental values
-                            for k, idx in enumerate(range(blank_start, i)):
-                                priority_col.iloc[idx] = last_value + k + 1
-                
-                last_value = current_value
-            elif i == 0:
-                # First row is blank, start with 1
-                priority_col.iloc[i] = 1
-                last_value = 1
-        
-        # Handle any remaining blanks at the end
-        for i in range(len(priority_col)):
-            if pd.isna(priority_col.iloc[i]):
-                priority_col.iloc[i] = last_value + 1
-                last_value += 1
+        # Fill blanks with sequential numbers continuing from the last non-blank
+        # value above them (leading blanks start from 1)
+        is_valid = ~np.isnan(priority_col)
+        positions = np.arange(len(priority_col))
+        last_valid = np.maximum.accumulate(np.where(is_valid, positions, -1))
+        last_value = np.where(last_valid >= 0, priority_col[np.maximum(last_valid, 0)], 0)
+        priority_col = np.where(is_valid, priority_col, last_value + (positions - last_valid))
         
         # Update the mapped_data with filled priorities
         mapped_data['Priority'] = priority_col.astype(int)
@@ -259,240 +268,143 @@ def process_single_cqe_file(cqe_file_path):
     
     # Assign teams based on Failure Mode
     logger.info("Assigning teams based on Failure Mode...")
-    gl_nt_toggle = True  # Start with GL
+    is_pp = mapped_data['Failure Mode'].isin(['Power', 'Thermal'])
     
-    for idx in range(len(mapped_data)):
-        failure_mode = mapped_data.loc[idx, 'Failure Mode']
-        
-        if failure_mode in ['Power', 'Thermal']:
-            mapped_data.loc[idx, 'Assignment'] = 'PP'
-        else:
-            # Alternate between GL and NT for non-Power/Thermal bugs
-            mapped_data.loc[idx, 'Assignment'] = 'GL' if gl_nt_toggle else 'NT'
-            gl_nt_toggle = not gl_nt_toggle  # Toggle for next non-PP bug
+    # Alternate between GL and NT for non-Power/Thermal bugs, starting with GL
+    gl_turn = (~is_pp).cumsum() % 2 == 1
+    assignment = pd.Series('NT', index=mapped_data.index).mask(gl_turn, 'GL').mask(is_pp, 'PP')
+    mapped_data['Assignment'] = pd.Categorical(assignment, categories=['GL', 'NT', 'PP'])
     
     # Log assignment summary
     assignment_counts = mapped_data['Assignment'].value_counts()
     logger.info("Team assignment results:")
     for team, count in assignment_counts.items():
-        logger.info(f"  {team}: {count} bugs")
+        if count:
+            logger.info("  %s: %d bugs", team, count)
     
     # Step 3: Create output Excel with proper structure
+    # Daily New and the team sheets are streamed out in a single pass
     logger.info("Creating output Excel file...")
     import openpyxl
+    from openpyxl.cell import WriteOnlyCell
     from openpyxl.styles import Font, PatternFill, Alignment
     from openpyxl.styles.colors import Color
+    from openpyxl.utils import get_column_letter
     from openpyxl.worksheet.datavalidation import DataValidation
     
-    wb = openpyxl.Workbook()
-    
-    # Remove default sheet
-    wb.remove(wb.active)
+    # Write-only workbooks start without a default sheet
+    wb = openpyxl.Workbook(write_only=True)
     
     # Create required sheets
-    sheets = ['Daily New', 'GL', 'NT', 'PP']
+    sheets = {sheet_name: wb.create_sheet(sheet_name) for sheet_name in ['Daily New', 'GL', 'NT', 'PP']}
     
     # Define black fill for non-SXM5 rows - using explicit opaque black
     black_color = Color(rgb="FF000000", type="rgb")
     black_fill = PatternFill(patternType="solid", fgColor=black_color, bgColor=black_color)
     white_font = Font(color="FFFFFF", bold=True)  # White text on black background
-    
-    for sheet_name in sheets:
-        ws = wb.create_sheet(sheet_name)
+    header_font = Font(bold=True)
+    header_fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
+    right_align = Alignment(horizontal='right')
+    
+    sn_col = column_order.index('SN Associated')
+    
+    def styled_row(ws, values, should_highlight):
+        """Wrap the cells that need formatting in WriteOnlyCells"""
+        cells = list(values)
+        for col_idx, value in enumerate(cells):
+            is_sn = col_idx == sn_col and value and value != ''
+            if should_highlight or is_sn:
+                cell = WriteOnlyCell(ws, value=value)
+                # Apply black highlighting if needed
+                if should_highlight:
+                    cell.fill = black_fill
+                    cell.font = white_font
+                # SN Associated is stored as text to preserve the full number,
+                # right-aligned to look like a number
+                if is_sn:
+                    cell.alignment = right_align
+                cells[col_idx] = cell
+        return cells
+    
+    for ws in sheets.values():
+        # Adjust column widths (must happen before any rows are written)
+        for col_idx in range(1, len(column_order) + 1):
+            ws.column_dimensions[get_column_letter(col_idx)].width = 15
         
         # Add headers
-        for col_idx, header in enumerate(column_order, 1):
-            cell = ws.cell(row=1, column=col_idx, value=header)
-            # Format header
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
+        header_cells = []
+        for header in column_order:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.font = header_font
+            cell.fill = header_fill
+            header_cells.append(cell)
+        ws.append(header_cells)
+    
+    # Step 4: Add all the data to Daily New and distribute bugs to team sheets
+    # based on Assignment. Black-highlighted (non-SXM5) rows stay in Daily New only
+    logger.info("Distributing bugs to team sheets based on Assignment...")
+    team_counts = {'GL': 0, 'NT': 0, 'PP': 0}
+    
+    assignment_col = column_order.index('Assignment')
+    
+    for row_idx, row_data in enumerate(mapped_data.itertuples(index=False, name=None)):
+        # Check if this row should be highlighted
+        should_highlight = highlight_mask[row_idx]
+        sheets['Daily New'].append(styled_row(sheets['Daily New'], row_data, should_highlight))
         
-        # If this is the Daily New sheet, add all the data
-        if sheet_name == 'Daily New':
-            # Create data validation for Assignment column (column 1)
+        assignment = row_data[assignment_col]
+        if not should_highlight and assignment in team_counts:
+            sheets[assignment].append(styled_row(sheets[assignment], row_data, False))
+            team_counts[assignment] += 1
+    
+    # Add dropdown to the Assignment column (column 1) of every sheet as one range
+    sheet_rows = {'Daily New': len(mapped_data), **team_counts}
+    for sheet_name, row_count in sheet_rows.items():
+        if row_count > 0:
             dv = DataValidation(type="list", formula1='"GL,NT,PP"', allow_blank=True)
             dv.error = 'Please select a valid team'
             dv.errorTitle = 'Invalid Team'
             dv.prompt = 'Please select a team from the list'
             dv.promptTitle = 'Team Assignment'
-            
-            # Add the data validation to the worksheet
-            ws.add_data_validation(dv)
-            
-            for row_idx, row_data in mapped_data.iterrows():
-                excel_row = row_idx + 2  # Excel row number (1-indexed, plus header)
-                
-                # Check if this row should be highlighted
-                should_highlight = row_idx in rows_to_highlight
-                
-                for col_idx, (col_name, value) in enumerate(zip(column_order, row_data), 1):
-                    cell = ws.cell(row=excel_row, column=col_idx, value=value)
-                    
-                    # Add dropdown to Assignment column (column 1)
-                    if col_idx == 1:  # Assignment column
-                        dv.add(cell)
-                    
-                    # Apply black highlighting if needed
-                    if should_highlight:
-                        cell.fill = black_fill
-                        cell.font = white_font
-                    
-                    # Special formatting for SN Associated column (last column)
-                    if col_name == 'SN Associated' and value and value != '':
-                        # Store as text to preserve full number without scientific notation
-                        cell.value = str(value)
-                        # Format to look like a number (right-aligned)
-                        cell.alignment = Alignment(horizontal='right')
-                        if should_highlight:
-                            cell.fill = black_fill
-                            cell.font = white_font
-        
-        # Adjust column widths
-        for col in ws.columns:
-            ws.column_dimensions[col[0].column_letter].width = 15
-    
-    # Save the workbook
-    wb.save(output_file)
-    logger.info(f"Created output file with {len(mapped_data)} bugs")
-    
-    # Debug: Verify highlighting was applied
-    logger.info("Verifying highlighting in saved file...")
-    wb_check = openpyxl.load_workbook(output_file)
-    ws_check = wb_check['Daily New']
-    for idx in rows_to_highlight[:5]:  # Check first 5 highlighted rows
-        cell = ws_check.cell(row=idx+2, column=1)
-        logger.info(f"Row {idx+2}: Fill = {cell.fill.fgColor.rgb if cell.fill.fgColor else 'None'}")
-    wb_check.close()
-    
-    # Step 4: Process with the standard workflow
-    # NOTE: We'll only do the distribution part to preserve highlighting
-    logger.info("Distributing bugs to team sheets based on Assignment...")
-    
-    # Load the workbook we just created
-    wb_dist = openpyxl.load_workbook(output_file)
-    
-    # Get the Daily New sheet
-    daily_new_sheet = wb_dist['Daily New']
-    
-    # Clear existing data in team sheets (except headers)
-    for team in ['GL', 'NT', 'PP']:
-        team_sheet = wb_dist[team]
-        # Delete all rows except header
-        team_sheet.delete_rows(2, team_sheet.max_row)
-    
-    # Track next available row for each team
-    team_next_row = {'GL': 2, 'NT': 2, 'PP': 2}
-    
-    # Iterate through Daily New sheet and copy rows to appropriate team sheets
-    for row in range(2, daily_new_sheet.max_row + 1):
-        assignment = daily_new_sheet.cell(row=row, column=1).value  # Assignment is column 1
-        
-        if assignment in ['GL', 'NT', 'PP']:
-            # Get the target sheet
-            target_sheet = wb_dist[assignment]
-            target_row = team_next_row[assignment]
-            
-            # Copy the entire row including formatting
-            for col in range(1, daily_new_sheet.max_column + 1):
-                source_cell = daily_new_sheet.cell(row=row, column=col)
-                target_cell = target_sheet.cell(row=target_row, column=col)
-                
-                # Copy value
-                target_cell.value = source_cell.value
-                
-                # Copy formatting (including black highlighting)
-                if source_cell.fill.patternType:
-                    target_cell.fill = PatternFill(
-                        patternType=source_cell.fill.patternType,
-                        fgColor=source_cell.fill.fgColor,
-                        bgColor=source_cell.fill.bgColor
-                    )
-                if source_cell.font:
-                    target_cell.font = Font(
-                        name=source_cell.font.name,
-                        size=source_cell.font.size,
-                        bold=source_cell.font.bold,
-                        italic=source_cell.font.italic,
-                        color=source_cell.font.color
-                    )
-                if source_cell.alignment:
-                    target_cell.alignment = Alignment(
-                        horizontal=source_cell.alignment.horizontal,
-                        vertical=source_cell.alignment.vertical
-                    )
-            
-            # Add dropdown to Assignment column in team sheet
-            dv_team = DataValidation(type="list", formula1='"GL,NT,PP"', allow_blank=True)
-            dv_team.error = 'Please select a valid team'
-            dv_team.errorTitle = 'Invalid Team'
-            dv_team.prompt = 'Please select a team from the list'
-            dv_team.promptTitle = 'Team Assignment'
-            target_sheet.add_data_validation(dv_team)
-            dv_team.add(target_sheet.cell(row=target_row, column=1))
-            
-            # Increment the row counter for this team
-            team_next_row[assignment] += 1
+            # Write-only sheets have no add_data_validation helper
+            sheets[sheet_name].data_validations.append(dv)
+            dv.add(f'A2:A{row_count + 1}')
     
     # Log distribution results
     logger.info("Distribution results:")
     for team in ['GL', 'NT', 'PP']:
-        count = team_next_row[team] - 2  # Subtract 2 to get actual count (header + starting at 2)
-        logger.info(f"  {team}: {count} bugs")
-    
-    # Save the workbook with distributed data
-    wb_dist.save(output_file)
-    wb_dist.close()
+        logger.info("  %s: %d bugs", team, team_counts[team])
     
-    # Step 5: Remove black-highlighted rows from team sheets
-    logger.info("Removing black-highlighted rows from team sheets...")
-    
-    # Reload the workbook to clean up black rows
-    wb_cleanup = openpyxl.load_workbook(output_file)
-    
-    for team in ['GL', 'NT', 'PP']:
-        team_sheet = wb_cleanup[team]
-        rows_to_delete = []
-        
-        # Check each row for black highlighting (starting from row 2 to skip header)
-        for row in range(2, team_sheet.max_row + 1):
-            # Check if any cell in the row has black fill
-            cell = team_sheet.cell(row=row, column=1)  # Check first cell
-            if cell.fill.fgColor and cell.fill.fgColor.rgb == 'FF000000':
-                rows_to_delete.append(row)
-        
-        # Delete rows in reverse order to maintain correct row numbers
-        for row in reversed(rows_to_delete):
-            team_sheet.delete_rows(row, 1)
-            logger.info(f"Removed black-highlighted row from {team} sheet")
-        
-        if rows_to_delete:
-            logger.info(f"Removed {len(rows_to_delete)} black-highlighted rows from {team} sheet")
-    
-    # Save the cleaned workbook
-    wb_cleanup.save(output_file)
-    wb_cleanup.close()
+    # Save the workbook
+    if save_target is None:
+        save_target = output_file
+    wb.save(save_target)
+    logger.info(f"Created output file with {len(mapped_data)} bugs")
     
-    # Log final distribution after cleanup
-    logger.info("Final distribution after removing black-highlighted rows:")
-    wb_final = openpyxl.load_workbook(output_file)
-    for team in ['GL', 'NT', 'PP']:
-        team_sheet = wb_final[team]
-        # Count non-empty rows (excluding header)
-        count = 0
-        for row in range(2, team_sheet.max_row + 1):
-            if any(team_sheet.cell(row=row, column=col).value for col in range(1, 9)):
-                count += 1
-        logger.info(f"  {team}: {count} bugs")
-    wb_final.close()
+    # Debug: Verify highlighting was applied (re-reads the saved file, so only
+    # when debug logging is enabled)
+    if logger.isEnabledFor(logging.DEBUG) and len(rows_to_highlight) > 0:
+        logger.debug("Verifying highlighting in saved file...")
+        if hasattr(save_target, 'seek'):
+            save_target.seek(0)
+        wb_check = openpyxl.load_workbook(save_target, read_only=True)
+        ws_check = wb_check['Daily New']
+        for idx in rows_to_highlight[:5]:  # Check first 5 highlighted rows
+            cell = ws_check.cell(row=idx+2, column=1)
+            logger.debug("Row %d: Fill = %s", idx + 2, cell.fill.fgColor.rgb if cell.fill.fgColor else 'None')
+        wb_check.close()
+    
+    # Team sheets hold every assigned row except the black-highlighted ones
+    team_data = mapped_data.drop(index=rows_to_highlight)
     
     logger.info("=== Process completed successfully! ===")
-    logger.info(f"Output saved to: {output_file}")
+    logger.info(f"Output saved to: {'memory buffer' if hasattr(save_target, 'write') else save_target}")
     
-    # Step 6: Create and send email with team sheet contents
+    # Step 5: Create and send email with team sheet contents
     logger.info("Preparing bug assignment report...")
     
     # Create HTML email content
-    html_content = create_team_sheets_email_html(output_file)
+    html_content = create_team_sheets_email_html(team_data)
     
     # Save HTML report
     report_filename = f"bug_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
@@ -511,86 +423,56 @@ def process_single_cqe_file(cqe_file_path):
     # Commented out for Streamlit compatibility
     # serve_html_report(report_filename)
     
+    if return_details:
+        return output_file, {'team_counts': team_counts, 'html_report': html_content}
     return output_file
 
 
-def create_team_sheets_email_html(excel_file):
-    """Create HTML content with tables for each team sheet"""
-    import openpyxl
+def create_team_sheets_email_html(team_data):
+    """
+    Create HTML content with tables for each team sheet
+    
+    Args:
+        team_data: DataFrame of distributed bugs with an 'Assignment' column,
+                   or path to a processed Excel file (team sheets are read with pandas)
+    """
     from datetime import datetime
     
-    wb = openpyxl.load_workbook(excel_file)
+    headers = ['Assignment', 'Bug ID', 'Priority', 'Title', 'Failure Mode', 
+               'Created Date', 'COMPLETED', 'SN Associated', 'Product']
     
-    html = f"""
-    <html>
-    <head>
-        <style>
-            body {{ font-family: Arial, sans-serif; }}
-            h1 {{ color: #333; }}
-            h2 {{ color: #666; margin-top: 30px; }}
-            table {{ border-collapse: collapse; margin-bottom: 30px; width: 100%; }}
-            th {{ background-color: #4CAF50; color: white; padding: 12px; text-align: left; }}
-            td {{ border: 1px solid #ddd; padding: 8px; }}
-            tr:nth-child(even) {{ background-color: #f2f2f2; }}
-            .summary {{ background-color: #e7f3ff; padding: 15px; margin-bottom: 20px; border-radius: 5px; }}
-        </style>
-    </head>
-    <body>
-        <h1>Daily Bug Assignment Report - {datetime.now().strftime('%Y-%m-%d %H:%M')}</h1>
-        <div class="summary">
-            <strong>Summary:</strong><br>
-    """
+    if isinstance(team_data, pd.DataFrame):
+        team_frames = {team: team_data[team_data['Assignment'] == team] for team in ['GL', 'NT', 'PP']}
+    else:
+        team_frames = pd.read_excel(team_data, sheet_name=['GL', 'NT', 'PP'])
+        # Skip rows without data in the first 8 columns
+        team_frames = {team: df.dropna(how='all', subset=df.columns[:8]) for team, df in team_frames.items()}
+    
+    # Collect the document in parts and join once at the end
+    parts = [EMAIL_HTML_HEAD.format(timestamp=datetime.now().strftime('%Y-%m-%d %H:%M'))]
     
     # Add summary counts
-    team_counts = {}
+    team_counts = {team: len(team_frames[team]) for team in ['GL', 'NT', 'PP']}
     for team in ['GL', 'NT', 'PP']:
-        ws = wb[team]
-        count = 0
-        for row in range(2, ws.max_row + 1):
-            if any(ws.cell(row=row, column=col).value for col in range(1, 9)):
-                count += 1
-        team_counts[team] = count
-        html += f"&nbsp;&nbsp;&nbsp;&nbsp;{team}: {count} bugs<br>"
+        parts.append(f"&nbsp;&nbsp;&nbsp;&nbsp;{team}: {team_counts[team]} bugs<br>")
     
-    html += f"&nbsp;&nbsp;&nbsp;&nbsp;<strong>Total: {sum(team_counts.values())} bugs</strong>"
-    html += "</div>"
+    parts.append(f"&nbsp;&nbsp;&nbsp;&nbsp;<strong>Total: {sum(team_counts.values())} bugs</strong>")
+    parts.append("</div>")
     
     # Create table for each team
     for team in ['GL', 'NT', 'PP']:
-        ws = wb[team]
-        html += f"<h2>{team} Team - {team_counts[team]} bugs</h2>"
-        html += "<table>"
-        
-        # Add headers
-        html += "<tr>"
-        headers = ['Assignment', 'Bug ID', 'Priority', 'Title', 'Failure Mode', 
-                  'Created Date', 'COMPLETED', 'SN Associated', 'Product']
-        for header in headers:
-            html += f"<th>{header}</th>"
-        html += "</tr>"
+        team_df = team_frames[team].reindex(columns=headers)
+        parts.append(f"<h2>{team} Team - {team_counts[team]} bugs</h2>")
         
-        # Add data rows
-        for row in range(2, ws.max_row + 1):
-            # Check if row has data
-            if any(ws.cell(row=row, column=col).value for col in range(1, 9)):
-                html += "<tr>"
-                for col in range(1, 10):  # 9 columns including Product
-                    value = ws.cell(row=row, column=col).value or ""
-                    # Truncate long titles for better display
-                    if col == 4 and len(str(value)) > 50:  # Title column
-                        value = str(value)[:50] + "..."
-                    html += f"<td>{value}</td>"
-                html += "</tr>"
+        # Truncate long titles for better display
+        titles = team_df['Title'].fillna('').astype(str)
+        team_df = team_df.assign(Title=titles.where(titles.str.len() <= 50, titles.str[:50] + "..."))
         
-        html += "</table>"
+        parts.append(team_df.to_html(index=False, escape=True, border=0, classes='team', na_rep=''))
     
-    html += """
-    </body>
-    </html>
-    """
+    parts.append(EMAIL_HTML_TAIL)
     
-    wb.close()
-    return html
+    return ''.join(parts)
 
 
 def run_offline_process(target_excel_path, source_excel_path=None):
@@ -630,9 +512,9 @@ def run_offline_process(target_excel_path, source_excel_path=None):
         backup_name = f"processed_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.path.basename(target_excel_path)}"
         backup_path = os.path.join(os.path.dirname(target_excel_path), backup_name)
         
-        # Copy the file as backup
+        # Copy the file contents as backup (no metadata needed for a timestamped copy)
         import shutil
-        shutil.copy2(target_excel_path, backup_path)
+        shutil.copyfile(target_excel_path, backup_path)
         logger.info(f"Backup saved at: {backup_path}")
         
         return True
@@ -647,10 +529,16 @@ def run_offline_process(target_excel_path, source_excel_path=None):
 def create_blank_excel_template(output_path="blank_template.xlsx"):
     """
     Create a blank Excel template with the required sheets and structure
+    
+    Args:
+        output_path: Path or writable binary file (e.g. io.BytesIO) to save the template to
     """
     import openpyxl
+    from openpyxl.styles import Font, PatternFill
+    from openpyxl.utils import get_column_letter
     
-    logger.info(f"Creating blank Excel template at: {output_path}")
+    target_name = 'memory buffer' if hasattr(output_path, 'write') else output_path
+    logger.info(f"Creating blank Excel template at: {target_name}")
     
     # Create new workbook
     wb = openpyxl.Workbook()
@@ -667,30 +555,23 @@ def create_blank_excel_template(output_path="blank_template.xlsx"):
         'Created Date', 'COMPLETED', 'SN Associated'
     ]
     
+    # Header row format, shared by every sheet
+    header_font = Font(bold=True)
+    header_fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
+    
     for sheet_name in sheets:
         ws = wb.create_sheet(sheet_name)
         
-        # Add headers
+        # Add and format headers, and adjust column widths
         for col, header in enumerate(headers, 1):
-            ws.cell(row=1, column=col, value=header)
-            
-        # Format header row
-        from openpyxl.styles import Font, PatternFill
-        header_font = Font(bold=True)
-        header_fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
-        
-        for col in range(1, len(headers) + 1):
-            cell = ws.cell(row=1, column=col)
+            cell = ws.cell(row=1, column=col, value=header)
             cell.font = header_font
             cell.fill = header_fill
-            
-        # Adjust column widths
-        for col in ws.columns:
-            ws.column_dimensions[col[0].column_letter].width = 15
+            ws.column_dimensions[get_column_letter(col)].width = 15
     
     # Save the workbook
     wb.save(output_path)
-    logger.info(f"Blank template created: {output_path}")
+    logger.info(f"Blank template created: {target_name}")
     
     return output_path
 
@@ -761,19 +642,48 @@ def main():
 
 
 def kill_port_8080():
-    """Kill any process using port 8080"""
+    """Kill any process listening on port 8080"""
+    import signal
     import subprocess
+    import time
     try:
-        # Find process using the port
-        result = subprocess.run(['lsof', '-t', '-i', ':8080'], 
-                              capture_output=True, text=True)
-        if result.stdout.strip():
-            pids = result.stdout.strip().split('\n')
+        pids = set()
+        if os.path.exists('/proc/net/tcp'):
+            # Linux: find the inodes of sockets listening on port 8080 in the
+            # kernel's socket tables (state 0A is LISTEN)
+            inodes = set()
+            for table in ['/proc/net/tcp', '/proc/net/tcp6']:
+                if not os.path.exists(table):
+                    continue
+                with open(table) as f:
+                    next(f)  # Skip header line
+                    for line in f:
+                        fields = line.split()
+                        if int(fields[1].rsplit(':', 1)[1], 16) == 8080 and fields[3] == '0A':
+                            inodes.add(f"socket:[{fields[9]}]")
+            
+            # Find the processes holding those sockets open
+            if inodes:
+                for pid in os.listdir('/proc'):
+                    if not pid.isdigit() or int(pid) == os.getpid():
+                        continue
+                    fd_dir = f"/proc/{pid}/fd"
+                    try:
+                        if any(os.readlink(os.path.join(fd_dir, fd)) in inodes for fd in os.listdir(fd_dir)):
+                            pids.add(int(pid))
+                    except OSError:
+                        continue  # Process exited or belongs to another user
+        else:
+            # No /proc socket tables (e.g. macOS): ask lsof for the listeners
+            result = subprocess.run(['lsof', '-t', '-iTCP:8080', '-sTCP:LISTEN'],
+                                    capture_output=True, text=True)
+            pids = {int(pid) for pid in result.stdout.split()} - {os.getpid()}
+        
+        if pids:
             for pid in pids:
                 logger.info(f"Killing existing process {pid} on port 8080")
-                subprocess.run(['kill', pid])
+                os.kill(pid, signal.SIGTERM)
             # Give it a moment to release the port
-            import time
             time.sleep(1)
             logger.info("Port 8080 cleared")
     except Exception as e:
@@ -782,16 +692,12 @@ def kill_port_8080():
 
 def serve_html_report(report_filename):
     """Start HTTP server to serve the HTML report"""
+    import errno
     import http.server
-    import socketserver
     import socket
-    import threading
     
     PORT = 8080
     
-    # Kill any existing server on port 8080
-    kill_port_8080()
-    
     # Get network info
     try:
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -811,10 +717,25 @@ def serve_html_report(report_filename):
     print(f"{'='*70}")
     print(f"Press Ctrl+C to stop the server and exit\n")
     
-    # Start server
-    Handler = http.server.SimpleHTTPRequestHandler
+    # Start server - one thread per request so the browser's parallel requests
+    # don't queue, with Nagle disabled on each connection for small responses.
+    # ThreadingHTTPServer sets SO_REUSEADDR, which only lets a restart rebind
+    # while the previous server's sockets sit in TIME_WAIT; a server still
+    # listening keeps the port, so that case falls back to kill_port_8080
+    class Handler(http.server.SimpleHTTPRequestHandler):
+        disable_nagle_algorithm = True
+    
     try:
-        with socketserver.TCPServer(("", PORT), Handler) as httpd:
+        try:
+            httpd = http.server.ThreadingHTTPServer(("", PORT), Handler)
+        except OSError as e:
+            if e.errno != errno.EADDRINUSE:
+                raise
+            # Another server still owns port 8080 - kill it and try again
+            kill_port_8080()
+            httpd = http.server.ThreadingHTTPServer(("", PORT), Handler)
+        
+        with httpd:
             httpd.serve_forever()
     except KeyboardInterrupt:
         print("\n✅ Server stopped. Goodbye!")
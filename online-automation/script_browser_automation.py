@@ -5,7 +5,10 @@ Automates downloading from Google Sheets, Excel processing, and uploading back
 """
 
 import os
+import re
+import shutil
 import time
+import atexit
 import logging
 from datetime import datetime
 from selenium import webdriver
@@ -14,19 +17,92 @@ from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 import pandas as pd
+import requests
 from script import CQEToOursNewest
 from dotenv import load_dotenv
 import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.image import MIMEImage
-from email.mime.base import MIMEBase
-from email import encoders
-import matplotlib.pyplot as plt
+from email.message import EmailMessage
+from PIL import Image, ImageDraw, ImageFont
 import openpyxl
 import urllib.parse
+import hashlib
+import io
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+# Prefer the Rust-based calamine reader when available; pandas' openpyxl reader
+# already opens workbooks read-only with data_only, so it is a fine fallback
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = 'openpyxl'
+
+# Parsed sheets keyed by (file content digest, sheet), so the screenshot capture
+# parses each tab once and a later report on an unchanged workbook reuses them
+_SHEET_CACHE = {}
+_SHEET_CACHE_MAX = 16
+
+
+def _table_fonts(size=14):
+    """Load regular and bold fonts for screenshots, falling back to Pillow's default"""
+    try:
+        return ImageFont.truetype('DejaVuSans.ttf', size), ImageFont.truetype('DejaVuSans-Bold.ttf', size)
+    except OSError:
+        font = ImageFont.load_default()
+        return font, font
+
+
+def _file_digest(path):
+    """Hash the file contents so edits to the workbook invalidate the cache"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_sheet(xlsx, digest, sheet_name):
+    """Return a sheet as a DataFrame, reusing an earlier parse of the same contents
+    
+    Args:
+        xlsx: Open pd.ExcelFile to parse from
+        digest: Content digest of the workbook, computed once by the caller
+        sheet_name: Sheet name or 0-based index
+    """
+    key = (digest, sheet_name)
+    df = _SHEET_CACHE.get(key)
+    if df is None:
+        df = xlsx.parse(sheet_name)
+        if len(_SHEET_CACHE) >= _SHEET_CACHE_MAX:
+            _SHEET_CACHE.pop(next(iter(_SHEET_CACHE)))
+        _SHEET_CACHE[key] = df
+    return df
+
+
+@functools.lru_cache(maxsize=_SHEET_CACHE_MAX)
+def _count_data_rows(excel_file, digest):
+    """Count the rows below the header of the first sheet without building a DataFrame
+    
+    Args:
+        excel_file: Path to the workbook
+        digest: Content digest of excel_file, so a changed file is counted again
+    """
+    if EXCEL_ENGINE == 'calamine':
+        sheet = python_calamine.CalamineWorkbook.from_path(excel_file).get_sheet_by_index(0)
+        return max(sheet.height - 1, 0)
+    
+    workbook = openpyxl.load_workbook(excel_file, read_only=True, data_only=True, keep_links=False)
+    try:
+        worksheet = workbook.worksheets[0]
+        # Files written in write-only mode carry no dimension record, so scan for it
+        worksheet.calculate_dimension(force=True)
+        return max((worksheet.max_row or 0) - 1, 0)
+    finally:
+        workbook.close()
+
 
 # Load environment variables
 load_dotenv()
@@ -44,43 +120,89 @@ class ExcelScreenshotCapture:
     
     def __init__(self, excel_file):
         self.excel_file = excel_file
-        self.workbook = openpyxl.load_workbook(excel_file)
+        # Open the workbook once; every tab is parsed from this handle
+        self._xlsx = pd.ExcelFile(excel_file, engine=EXCEL_ENGINE)
+        self.sheet_names = self._xlsx.sheet_names
+        # Hash the workbook once; it keys every sheet this instance parses
+        self._digest = _file_digest(excel_file)
+        
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        
+    def close(self):
+        """Release the underlying workbook handle"""
+        self._xlsx.close()
         
-    def capture_sheet_as_image(self, sheet_name, output_path):
-        """Convert Excel sheet to image"""
+    def capture_sheet_as_image(self, sheet_name, output_path=None):
+        """
+        Convert Excel sheet to image
+        
+        Args:
+            sheet_name: Name of the sheet to render
+            output_path: Where to save the PNG; when omitted the PNG bytes are returned
+        """
         # Read the sheet into a dataframe
-        df = pd.read_excel(self.excel_file, sheet_name=sheet_name)
-        
-        # Create figure and axis
-        fig, ax = plt.subplots(figsize=(20, 10))
-        ax.axis('tight')
-        ax.axis('off')
-        
-        # Create table
-        table = ax.table(cellText=df.values,
-                        colLabels=df.columns,
-                        cellLoc='center',
-                        loc='center')
-        
-        # Style the table
-        table.auto_set_font_size(False)
-        table.set_fontsize(9)
-        table.scale(1.2, 1.5)
-        
-        # Style header row
-        for i in range(len(df.columns)):
-            table[(0, i)].set_facecolor('#4CAF50')
-            table[(0, i)].set_text_props(weight='bold', color='white')
-        
-        # Alternate row colors
-        for i in range(1, len(df) + 1):
-            for j in range(len(df.columns)):
-                if i % 2 == 0:
-                    table[(i, j)].set_facecolor('#f0f0f0')
-        
-        # Save the figure
-        plt.savefig(output_path, bbox_inches='tight', dpi=150, pad_inches=0.1)
-        plt.close()
+        df = _load_sheet(self._xlsx, self._digest, sheet_name)
+        
+        # Render the table straight to a bitmap with Pillow
+        header = [str(col) for col in df.columns]
+        rows = df.astype(object).fillna('').astype(str).values.tolist()
+        font, bold_font = _table_fonts()
+        pad_x, row_height = 12, 28
+        text_height = font.getbbox('Ag')[3]
+        
+        # Measure each distinct value once; columns like Assignment and Failure
+        # Mode repeat the same few strings on every row
+        text_widths = {text: font.getlength(text) for row in rows for text in set(row)}
+        header_widths = [bold_font.getlength(label) for label in header]
+        
+        col_widths = []
+        for j, label_width in enumerate(header_widths):
+            widest = max((text_widths[row[j]] for row in rows), default=0)
+            col_widths.append(int(max(label_width, widest)) + 2 * pad_x)
+        col_starts = [0]
+        for w in col_widths:
+            col_starts.append(col_starts[-1] + w)
+        width = col_starts[-1] + 1
+        height = row_height * (len(rows) + 1) + 1
+        
+        img = Image.new('RGB', (width, height), 'white')
+        draw = ImageDraw.Draw(img)
+        
+        # Header row and alternating row colors
+        draw.rectangle([0, 0, width - 1, row_height], fill='#4CAF50')
+        for i in range(2, len(rows) + 1, 2):
+            draw.rectangle([0, i * row_height, width - 1, (i + 1) * row_height], fill='#f0f0f0')
+        
+        # Cell text, centered in each cell
+        draw_text = draw.text
+        y_offset = (row_height - text_height) / 2
+        for j, label in enumerate(header):
+            x = col_starts[j] + (col_widths[j] - header_widths[j]) / 2
+            draw_text((x, y_offset), label, fill='white', font=bold_font)
+        for i, values in enumerate(rows, start=1):
+            y = i * row_height + y_offset
+            for j, text in enumerate(values):
+                if text:
+                    x = col_starts[j] + (col_widths[j] - text_widths[text]) / 2
+                    draw_text((x, y), text, fill='black', font=font)
+        
+        # Grid lines
+        for x in col_starts:
+            draw.line([(x, 0), (x, height - 1)], fill='#d0d0d0')
+        for i in range(len(rows) + 2):
+            draw.line([(0, i * row_height), (width - 1, i * row_height)], fill='#d0d0d0')
+        
+        if output_path is None:
+            buffer = io.BytesIO()
+            img.save(buffer, 'PNG')
+            logger.info(f"Screenshot rendered: {sheet_name}")
+            return buffer.getvalue()
+        
+        img.save(output_path, 'PNG')
         
         logger.info(f"Screenshot saved: {output_path}")
         return output_path
@@ -88,24 +210,40 @@ class ExcelScreenshotCapture:
     def capture_tabs(self, tab_indices=[1, 2, 3]):
         """Capture specific tabs (0-indexed)"""
         screenshots = []
-        sheet_names = self.workbook.sheetnames
         
         for idx in tab_indices:
-            if idx < len(sheet_names):
-                sheet_name = sheet_names[idx]
-                output_path = f"screenshot_tab_{idx+1}_{sheet_name.replace(' ', '_')}.png"
-                self.capture_sheet_as_image(sheet_name, output_path)
+            if idx < len(self.sheet_names):
+                sheet_name = self.sheet_names[idx]
                 screenshots.append({
-                    'path': output_path,
+                    'filename': f"screenshot_tab_{idx+1}_{sheet_name.replace(' ', '_')}.png",
                     'name': sheet_name,
                     'tab_number': idx + 1
                 })
         
+        # Parse serially since the shared ExcelFile handle is not thread-safe,
+        # then render the cached sheets concurrently
+        for screenshot in screenshots:
+            _load_sheet(self._xlsx, self._digest, screenshot['name'])
+        
+        with ThreadPoolExecutor(max_workers=max(1, len(screenshots))) as executor:
+            futures = [executor.submit(self.capture_sheet_as_image, screenshot['name'])
+                       for screenshot in screenshots]
+            # PNGs stay in memory; they only exist to be attached to the email
+            for screenshot, future in zip(screenshots, futures):
+                screenshot['bytes'] = future.result()
+        
         return screenshots
 
 
 class EmailSender:
-    """Sends emails with attachments using SMTP"""
+    """Sends emails with attachments using SMTP
+    
+    The SMTP connection is opened on the first send and reused for later ones;
+    use the sender as a context manager (or call close()) to log out.
+    """
+    
+    # Recycle the connection periodically so long runs don't hit server limits
+    MAX_MESSAGES_PER_CONNECTION = 100
     
     def __init__(self):
         # Email configuration from environment or defaults
@@ -113,11 +251,43 @@ class EmailSender:
         self.smtp_port = int(os.getenv('SMTP_PORT', '587'))
         self.sender_email = os.getenv('SENDER_EMAIL', '')
         self.sender_password = os.getenv('SENDER_PASSWORD', '')
+        self._smtp = None
+        self._sent_on_connection = 0
+        
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        
+    def _connection(self):
+        """Return a logged-in SMTP connection, opening a new one when needed"""
+        if self._smtp is None or self._sent_on_connection >= self.MAX_MESSAGES_PER_CONNECTION:
+            self.close()
+            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+            try:
+                server.starttls()
+                server.login(self.sender_email, self.sender_password)
+            except Exception:
+                server.close()
+                raise
+            self._smtp = server
+            self._sent_on_connection = 0
+        return self._smtp
+    
+    def close(self):
+        """Log out of the SMTP server if a connection is open"""
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                self._smtp.close()
+            self._smtp = None
         
     def create_email_body(self, excel_file):
         """Create HTML email body with summary"""
-        # Read the first sheet for summary
-        df = pd.read_excel(excel_file, sheet_name=0)
+        # Only the row count of the first sheet is needed for the summary
+        row_count = _count_data_rows(excel_file, _file_digest(excel_file))
         
         html_body = f"""
         <html>
@@ -130,7 +300,7 @@ class EmailSender:
                 
                 <h3>Summary:</h3>
                 <ul>
-                    <li>Total bugs processed: {len(df)}</li>
+                    <li>Total bugs processed: {row_count}</li>
                     <li>Excel file: {os.path.basename(excel_file)}</li>
                     <li>Processing completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</li>
                 </ul>
@@ -149,39 +319,40 @@ class EmailSender:
         """Send email with Excel file and screenshots"""
         
         # Create message
-        msg = MIMEMultipart('mixed')
+        msg = EmailMessage()
         msg['From'] = self.sender_email
         msg['To'] = ', '.join(recipients) if isinstance(recipients, list) else recipients
         msg['Subject'] = subject
         
         # Add HTML body
-        html_body = self.create_email_body(excel_file)
-        msg.attach(MIMEText(html_body, 'html'))
+        msg.set_content(self.create_email_body(excel_file), subtype='html')
         
         # Attach Excel file
         with open(excel_file, 'rb') as f:
-            excel_attachment = MIMEBase('application', 'vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-            excel_attachment.set_payload(f.read())
-            encoders.encode_base64(excel_attachment)
-            excel_attachment.add_header('Content-Disposition', f'attachment; filename={os.path.basename(excel_file)}')
-            msg.attach(excel_attachment)
+            msg.add_attachment(f.read(),
+                               maintype='application',
+                               subtype='vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                               filename=os.path.basename(excel_file))
         
         # Attach screenshots
         for screenshot in screenshots:
-            with open(screenshot['path'], 'rb') as f:
-                img = MIMEImage(f.read())
-                img.add_header('Content-Disposition', f'attachment; filename={os.path.basename(screenshot["path"])}')
-                img.add_header('Content-ID', f'<{screenshot["name"]}>')
-                msg.attach(img)
+            msg.add_attachment(screenshot['bytes'],
+                               maintype='image',
+                               subtype='png',
+                               filename=screenshot['filename'],
+                               cid=f'<{screenshot["name"]}>')
         
         # Send email
         try:
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
-                server.send_message(msg)
-                logger.info(f"Email sent successfully to {msg['To']}")
-                return True
+            try:
+                self._connection().send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                # The reused connection was dropped by the server; reconnect once
+                self.close()
+                self._connection().send_message(msg)
+            self._sent_on_connection += 1
+            logger.info(f"Email sent successfully to {msg['To']}")
+            return True
         except Exception as e:
             logger.error(f"Failed to send email: {e}")
             return False
@@ -193,21 +364,14 @@ def send_bug_assignment_email(excel_file, recipients):
     logger.info("Starting email process...")
     
     # Capture screenshots of tabs 2, 3, 4
-    screenshot_capture = ExcelScreenshotCapture(excel_file)
-    screenshots = screenshot_capture.capture_tabs([1, 2, 3])  # 0-indexed, so 1,2,3 = tabs 2,3,4
+    with ExcelScreenshotCapture(excel_file) as screenshot_capture:
+        screenshots = screenshot_capture.capture_tabs([1, 2, 3])  # 0-indexed, so 1,2,3 = tabs 2,3,4
     
     # Send email
-    email_sender = EmailSender()
     subject = f"Bug Assignment Report - {datetime.now().strftime('%Y-%m-%d')}"
     
-    success = email_sender.send_email(recipients, subject, excel_file, screenshots)
-    
-    # Clean up screenshot files
-    if success:
-        for screenshot in screenshots:
-            if os.path.exists(screenshot['path']):
-                os.remove(screenshot['path'])
-                logger.info(f"Cleaned up: {screenshot['path']}")
+    with EmailSender() as email_sender:
+        success = email_sender.send_email(recipients, subject, excel_file, screenshots)
     
     return success
 
@@ -225,28 +389,89 @@ Processing completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 Best regards,
 Bug Assignment Automation"""
     
-    # URL encode the subject and body
-    subject_encoded = urllib.parse.quote(subject)
-    body_encoded = urllib.parse.quote(body)
+    # URL encode the subject and body (quote keeps spaces as %20, which mail clients expect)
+    params = urllib.parse.urlencode({'subject': subject, 'body': body}, quote_via=urllib.parse.quote)
     recipients_str = ','.join(recipients) if isinstance(recipients, list) else recipients
     
-    mailto_link = f"mailto:{recipients_str}?subject={subject_encoded}&body={body_encoded}"
+    mailto_link = f"mailto:{recipients_str}?{params}"
     
     return mailto_link
 
 
+# Spreadsheet ID in a Google Sheets URL, used to build its xlsx export URL
+SHEET_ID_PATTERN = re.compile(r'/spreadsheets/d/([a-zA-Z0-9_-]+)')
+
+def _api_cell_value(value):
+    """Convert an openpyxl cell value into something the Sheets API accepts as JSON"""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return value
+
+
+# Chrome sessions shared by GoogleSheetsAutomation instances in the process, keyed
+# by (download_dir, headless) since both are fixed when Chrome starts; starting
+# Chrome is the slowest step of a run, so a matching instance reuses the browser
+_SHARED_DRIVERS = {}
+
+
+def get_driver(chrome_options, key):
+    """
+    Return the shared Chrome session for key, starting it on first use
+    
+    Args:
+        chrome_options: Options used if a new browser has to be started
+        key: (download_dir, headless) the options were built for
+        
+    Returns:
+        (driver, started) where started is True if this call launched the browser
+    """
+    driver = _SHARED_DRIVERS.get(key)
+    if driver is not None:
+        try:
+            driver.current_url
+            return driver, False
+        except WebDriverException:
+            # The browser was closed outside our control; start a new one
+            del _SHARED_DRIVERS[key]
+    
+    logger.info("Starting Chrome browser...")
+    driver = webdriver.Chrome(options=chrome_options)
+    driver.maximize_window()
+    _SHARED_DRIVERS[key] = driver
+    return driver, True
+
+
+@atexit.register
+def quit_shared_drivers():
+    """Quit every shared Chrome session still running"""
+    while _SHARED_DRIVERS:
+        _, driver = _SHARED_DRIVERS.popitem()
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+
 class GoogleSheetsAutomation:
     """Automates Google Sheets download/upload operations"""
     
-    def __init__(self, download_dir=None, headless=False):
+    def __init__(self, download_dir=None, headless=False, debug=None):
         """
         Initialize browser automation
         
         Args:
             download_dir: Directory for downloads (defaults to current dir)
             headless: Run browser in headless mode
+            debug: Save a browser screenshot when a step fails (defaults to the
+                AUTOMATION_DEBUG environment variable)
         """
         self.download_dir = download_dir or os.getcwd()
+        self.headless = headless
+        if debug is None:
+            debug = os.getenv('AUTOMATION_DEBUG', 'false').lower() == 'true'
+        self.debug = debug
         
         # Configure Chrome options
         self.chrome_options = Options()
@@ -257,80 +482,106 @@ class GoogleSheetsAutomation:
             "safebrowsing.enabled": True
         })
         
+        # Return from navigation at DOMContentLoaded; the explicit waits cover the rest
+        self.chrome_options.page_load_strategy = "eager"
+        
         if headless:
-            self.chrome_options.add_argument("--headless")
+            self.chrome_options.add_argument("--headless=new")
             self.chrome_options.add_argument("--no-sandbox")
             self.chrome_options.add_argument("--disable-dev-shm-usage")
+            self.chrome_options.add_argument("--disable-gpu")
+            self.chrome_options.add_argument("--window-size=1920,1080")
+            # The download/import menus don't need images
+            self.chrome_options.add_argument("--blink-settings=imagesEnabled=false")
             
         self.driver = None
+        self._owns_driver = False
+        self._http = None
         
-    def start_browser(self):
-        """Start Chrome browser"""
-        logger.info("Starting Chrome browser...")
-        self.driver = webdriver.Chrome(options=self.chrome_options)
-        self.driver.maximize_window()
+    def start_browser(self, fresh=False):
+        """
+        Start Chrome browser
+        
+        Args:
+            fresh: Start a private browser instead of reusing the shared session
+        """
+        if fresh:
+            logger.info("Starting Chrome browser...")
+            self.driver = webdriver.Chrome(options=self.chrome_options)
+            self.driver.maximize_window()
+            self._owns_driver = True
+        else:
+            self.driver, self._owns_driver = get_driver(
+                self.chrome_options, (os.path.abspath(self.download_dir), self.headless)
+            )
         
     def login_if_needed(self):
         """Check if login is needed and wait for user to login"""
         try:
             # Check if we're on a login page
             if "accounts.google.com" in self.driver.current_url:
+                # Nobody can see a headless browser to log in, so don't wait for it
+                if self.headless:
+                    message = ("Google login required, but the browser is headless. "
+                               "Run with HEADLESS_MODE=false and log in from the browser window.")
+                    logger.error(message)
+                    raise RuntimeError(message)
                 logger.info("Login required. Please login to Google account...")
                 # Wait up to 5 minutes for login
                 WebDriverWait(self.driver, 300).until(
                     lambda driver: "accounts.google.com" not in driver.current_url
                 )
                 logger.info("Login successful!")
-                time.sleep(2)
         except TimeoutException:
             logger.error("Login timeout - please try again")
             raise
             
-    def download_google_sheet(self, sheet_url, output_filename):
+    def download_google_sheet(self, sheet_url, output_filename, try_export=True):
         """
         Download a Google Sheet as Excel file
         
         Args:
             sheet_url: URL of the Google Sheet
             output_filename: Name for the downloaded file
+            try_export: Try the export URL before the File menu; pass False when
+                the caller has just tried it with the same session
         """
         logger.info(f"Downloading Google Sheet: {sheet_url}")
         
+        # Fetch the export directly when the browser session is already signed in
+        if try_export and self._download_via_export(sheet_url, output_filename):
+            logger.info(f"Downloaded successfully: {output_filename}")
+            return
+        
         # Navigate to sheet
         self.driver.get(sheet_url)
-        time.sleep(3)
         
         # Handle login if needed
         self.login_if_needed()
         
         # Wait for sheet to load
-        WebDriverWait(self.driver, 20).until(
-            EC.presence_of_element_located((By.ID, "docs-file-menu"))
-        )
-        time.sleep(2)
+        file_menu = self._wait_for_file_menu()
         
         try:
             # Click File menu
-            file_menu = self.driver.find_element(By.ID, "docs-file-menu")
             file_menu.click()
-            time.sleep(1)
             
             # Click Download
             download_option = WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, "//div[@aria-label='Download d']"))
             )
             download_option.click()
-            time.sleep(1)
             
             # Click Microsoft Excel (.xlsx)
             excel_option = WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, "//div[contains(@aria-label, 'Microsoft Excel')]"))
             )
+            existing_files = set(os.listdir(self.download_dir))
             excel_option.click()
             
             # Wait for download to complete
             logger.info("Waiting for download to complete...")
-            time.sleep(5)  # Adjust based on file size
+            self._wait_for_download(existing_files)
             
             # Rename downloaded file
             self._rename_latest_download(output_filename)
@@ -340,9 +591,54 @@ class GoogleSheetsAutomation:
         except Exception as e:
             logger.error(f"Error downloading sheet: {e}")
             # Take screenshot for debugging
-            self.driver.save_screenshot("download_error.png")
+            if self.debug:
+                self.driver.save_screenshot("download_error.png")
             raise
             
+    def download_google_sheets(self, downloads):
+        """
+        Download several Google Sheets, fetching their exports concurrently
+        
+        Args:
+            downloads: List of (sheet_url, output_filename) pairs
+        """
+        pending = self._download_via_exports(downloads)
+        while pending:
+            # Signs in through the browser if needed
+            sheet_url, output_filename = pending.pop(0)
+            self.download_google_sheet(sheet_url, output_filename, try_export=False)
+            # The browser may be signed in now, so retry the rest through their exports
+            pending = self._download_via_exports(pending)
+            
+    def _download_via_exports(self, downloads):
+        """
+        Fetch several sheets from their export URLs concurrently
+        
+        Args:
+            downloads: List of (sheet_url, output_filename) pairs
+            
+        Returns:
+            The pairs that could not be exported and need the File menu download
+        """
+        if not downloads:
+            return []
+        
+        # The driver is not thread-safe, so read its cookies once up front and
+        # let the worker threads only use the HTTP session
+        self._sync_http_cookies()
+        with ThreadPoolExecutor(max_workers=len(downloads)) as executor:
+            fetched = list(executor.map(
+                lambda item: self._download_via_export(*item, sync_cookies=False), downloads
+            ))
+        
+        pending = []
+        for (sheet_url, output_filename), done in zip(downloads, fetched):
+            if done:
+                logger.info(f"Downloaded successfully: {output_filename}")
+            else:
+                pending.append((sheet_url, output_filename))
+        return pending
+            
     def upload_to_google_sheet(self, sheet_url, excel_file):
         """
         Upload Excel file to Google Sheet
@@ -353,50 +649,47 @@ class GoogleSheetsAutomation:
         """
         logger.info(f"Uploading to Google Sheet: {sheet_url}")
         
+        # Write the values through the Sheets API when a service account is configured
+        if self._upload_via_api(sheet_url, excel_file):
+            logger.info("Upload completed successfully!")
+            return
+        
         # Navigate to sheet
         self.driver.get(sheet_url)
-        time.sleep(3)
         
         # Handle login if needed
         self.login_if_needed()
         
         # Wait for sheet to load
-        WebDriverWait(self.driver, 20).until(
-            EC.presence_of_element_located((By.ID, "docs-file-menu"))
-        )
-        time.sleep(2)
+        file_menu = self._wait_for_file_menu()
         
         try:
             # Click File menu
-            file_menu = self.driver.find_element(By.ID, "docs-file-menu")
             file_menu.click()
-            time.sleep(1)
             
             # Click Import
             import_option = WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, "//div[@aria-label='Import t']"))
             )
             import_option.click()
-            time.sleep(2)
             
             # Click Upload tab
             upload_tab = WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, "//div[text()='Upload']"))
             )
             upload_tab.click()
-            time.sleep(1)
             
             # Find file input and upload
-            file_input = self.driver.find_element(By.CSS_SELECTOR, "input[type='file']")
+            file_input = WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='file']"))
+            )
             file_input.send_keys(os.path.abspath(excel_file))
-            time.sleep(3)
             
-            # Select "Replace current sheet" option
-            replace_option = WebDriverWait(self.driver, 10).until(
+            # Select "Replace current sheet" option (appears once the file is uploaded)
+            replace_option = WebDriverWait(self.driver, 30).until(
                 EC.element_to_be_clickable((By.XPATH, "//span[contains(text(), 'Replace current sheet')]"))
             )
             replace_option.click()
-            time.sleep(1)
             
             # Click Import data button
             import_button = WebDriverWait(self.driver, 10).until(
@@ -404,32 +697,177 @@ class GoogleSheetsAutomation:
             )
             import_button.click()
             
-            # Wait for import to complete
+            # Wait for import to complete (the import dialog closes when it is done)
             logger.info("Waiting for import to complete...")
-            time.sleep(10)
+            WebDriverWait(self.driver, 60).until(
+                EC.invisibility_of_element_located((By.XPATH, "//span[text()='Import data']"))
+            )
             
             logger.info("Upload completed successfully!")
             
         except Exception as e:
             logger.error(f"Error uploading sheet: {e}")
             # Take screenshot for debugging
-            self.driver.save_screenshot("upload_error.png")
+            if self.debug:
+                self.driver.save_screenshot("upload_error.png")
             raise
             
+    def _upload_via_api(self, sheet_url, excel_file):
+        """
+        Overwrite the Google Sheet's tabs with the workbook's values via the Sheets API
+        
+        Each worksheet in excel_file replaces the tab with the same title. Needs
+        google-api-python-client and a service account key in GOOGLE_SERVICE_ACCOUNT_FILE
+        that has edit access to the sheet.
+        
+        Args:
+            sheet_url: URL of the target Google Sheet
+            excel_file: Path to Excel file to upload
+            
+        Returns:
+            True if the values were written, False if the Import menu is needed instead
+        """
+        credentials_file = os.getenv('GOOGLE_SERVICE_ACCOUNT_FILE')
+        match = SHEET_ID_PATTERN.search(sheet_url)
+        if not credentials_file or not match:
+            return False
+        
+        try:
+            from google.oauth2 import service_account
+            from googleapiclient.discovery import build
+        except ImportError:
+            logger.warning("google-api-python-client is not installed, using the Import menu instead")
+            return False
+        
+        spreadsheet_id = match.group(1)
+        try:
+            credentials = service_account.Credentials.from_service_account_file(
+                credentials_file, scopes=['https://www.googleapis.com/auth/spreadsheets']
+            )
+            spreadsheets = build('sheets', 'v4', credentials=credentials, cache_discovery=False).spreadsheets()
+            
+            metadata = spreadsheets.get(spreadsheetId=spreadsheet_id, fields='sheets.properties.title').execute()
+            existing_titles = {sheet['properties']['title'] for sheet in metadata.get('sheets', [])}
+            
+            data = []
+            workbook = openpyxl.load_workbook(excel_file, read_only=True)
+            try:
+                for worksheet in workbook.worksheets:
+                    if worksheet.title not in existing_titles:
+                        logger.warning(f"Tab '{worksheet.title}' not found in the Google Sheet, skipping")
+                        continue
+                    rows = [[_api_cell_value(value) for value in row]
+                            for row in worksheet.iter_rows(values_only=True)]
+                    quoted_title = worksheet.title.replace("'", "''")
+                    data.append({'range': f"'{quoted_title}'", 'values': rows})
+            finally:
+                workbook.close()
+            
+            if not data:
+                return False
+            
+            # One call clears every tab, one call writes them all
+            spreadsheets.values().batchClear(
+                spreadsheetId=spreadsheet_id, body={'ranges': [item['range'] for item in data]}
+            ).execute()
+            spreadsheets.values().batchUpdate(
+                spreadsheetId=spreadsheet_id, body={'valueInputOption': 'RAW', 'data': data}
+            ).execute()
+            return True
+        except Exception as e:
+            logger.warning(f"Sheets API upload failed, falling back to the Import menu: {e}")
+            return False
+        
+    def _sync_http_cookies(self):
+        """Copy the browser's Google Docs cookies into the reusable HTTP session"""
+        if self._http is None:
+            self._http = requests.Session()
+        # get_cookies() only returns cookies for the page the browser is on
+        if not self.driver.current_url.startswith('https://docs.google.com/'):
+            self.driver.get('https://docs.google.com/')
+        for cookie in self.driver.get_cookies():
+            self._http.cookies.set(cookie['name'], cookie['value'],
+                                   domain=cookie.get('domain'), path=cookie.get('path', '/'))
+        
+    def _download_via_export(self, sheet_url, output_filename, sync_cookies=True):
+        """
+        Download the sheet from its xlsx export URL using the browser's cookies
+        
+        Args:
+            sheet_url: URL of the Google Sheet
+            output_filename: Name for the downloaded file
+            sync_cookies: Refresh the HTTP session from the browser first; pass False
+                when the caller already did (e.g. from a worker thread)
+            
+        Returns:
+            True if the file was saved, False if the UI download is needed instead
+        """
+        match = SHEET_ID_PATTERN.search(sheet_url)
+        if not match:
+            return False
+        export_url = f"https://docs.google.com/spreadsheets/d/{match.group(1)}/export?format=xlsx"
+        
+        if sync_cookies:
+            self._sync_http_cookies()
+        
+        output_path = os.path.join(self.download_dir, output_filename)
+        partial_path = output_path + '.part'
+        try:
+            with self._http.get(export_url, stream=True, timeout=60) as response:
+                # Without a valid session Google answers with an HTML login page
+                content_type = response.headers.get('Content-Type', '')
+                if response.status_code != 200 or 'spreadsheetml' not in content_type:
+                    logger.info("Export URL unavailable, falling back to the File menu download")
+                    return False
+                response.raw.decode_content = True
+                with open(partial_path, 'wb') as f:
+                    shutil.copyfileobj(response.raw, f)
+            os.replace(partial_path, output_path)
+            return True
+        except (requests.RequestException, OSError) as e:
+            logger.warning(f"Export download failed, falling back to the File menu: {e}")
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            return False
+        
+    def _wait_for_file_menu(self):
+        """Wait for the sheet to load and return its clickable File menu"""
+        return WebDriverWait(self.driver, 20).until(
+            EC.element_to_be_clickable((By.ID, "docs-file-menu"))
+        )
+        
+    def _wait_for_download(self, existing_files, timeout=60):
+        """
+        Wait until a new Excel file has finished downloading
+        
+        Args:
+            existing_files: Names in the download directory before the download started
+            timeout: Seconds to wait before giving up
+        """
+        def download_finished(_):
+            names = os.listdir(self.download_dir)
+            # Chrome writes to a .crdownload file and renames it when complete
+            if any(name.endswith('.crdownload') for name in names):
+                return False
+            return any(name.endswith('.xlsx') and name not in existing_files for name in names)
+        
+        WebDriverWait(self.driver, timeout, poll_frequency=0.2).until(download_finished)
+        
     def _rename_latest_download(self, new_name):
         """Rename the most recently downloaded file"""
-        # Get list of files in download directory
-        files = os.listdir(self.download_dir)
-        files = [f for f in files if f.endswith('.xlsx') and not f.startswith('~$')]
+        # Find the most recent Excel file in a single directory pass
+        # (in-progress .crdownload files are skipped by the suffix check)
+        with os.scandir(self.download_dir) as entries:
+            latest_entry = max(
+                (entry for entry in entries
+                 if entry.name.endswith('.xlsx') and not entry.name.startswith('~$') and entry.is_file()),
+                key=lambda entry: entry.stat().st_ctime,
+                default=None
+            )
         
-        if not files:
+        if latest_entry is None:
             raise Exception("No Excel files found in download directory")
-            
-        # Get the most recent file
-        latest_file = max(
-            [os.path.join(self.download_dir, f) for f in files],
-            key=os.path.getctime
-        )
+        latest_file = latest_entry.path
         
         # Rename to desired name
         new_path = os.path.join(self.download_dir, new_name)
@@ -438,9 +876,20 @@ class GoogleSheetsAutomation:
         os.rename(latest_file, new_path)
         
     def close(self):
-        """Close the browser"""
-        if self.driver:
-            self.driver.quit()
+        """Close the browser if this instance started it (a reused session is left to its starter)"""
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+        if self.driver and self._owns_driver:
+            for key, driver in list(_SHARED_DRIVERS.items()):
+                if driver is self.driver:
+                    del _SHARED_DRIVERS[key]
+            try:
+                self.driver.quit()
+            except WebDriverException:
+                pass
+        self.driver = None
+        self._owns_driver = False
             
 
 def run_automated_process():
@@ -458,8 +907,9 @@ def run_automated_process():
     target_file = "custom-top-cqe-bugs-daily-assigner.xlsx"
     source_file = "cqe_bugs.xlsx" #the source url that is being renamed with a new save in xlsx (used in CQEToOursNewest class for processing)
     
-    # Initialize browser automation
-    automation = GoogleSheetsAutomation()
+    # Initialize browser automation (HEADLESS_MODE=true hides the browser, but then
+    # nobody can log in to Google, so it only suits sheets that need no login)
+    automation = GoogleSheetsAutomation(headless=os.getenv('HEADLESS_MODE', 'false').lower() == 'true')
     
     try:
         # Start browser
@@ -467,8 +917,10 @@ def run_automated_process():
         
         # Step 1: Download Google Sheets
         logger.info("=== Step 1: Downloading Google Sheets ===")
-        automation.download_google_sheet(target_sheet_url, target_file)
-        automation.download_google_sheet(source_sheet_url, source_file)
+        automation.download_google_sheets([
+            (target_sheet_url, target_file),
+            (source_sheet_url, source_file)
+        ])
         
         # Step 2: Process Excel files
         logger.info("=== Step 2: Processing Excel files ===")
@@ -236,16 +236,12 @@ class CQEToOursNewest:
         
         daily_sheet = self.sheets['Daily New']
         
-        # Get all bugs with assignments
-        for row in range(2, daily_sheet.max_row + 1):
-            assignment = daily_sheet.cell(row=row, column=1).value
+        # Get all bugs with assignments, walking the rows once as raw value tuples
+        for row_data in daily_sheet.iter_rows(min_row=2, values_only=True):
+            assignment = row_data[0]
             
             if assignment in ['GL', 'NT', 'PP']:
                 # Copy entire row to respective sheet
-                row_data = []
-                for col in range(1, daily_sheet.max_column + 1):
-                    row_data.append(daily_sheet.cell(row=row, column=col).value)
-                    
                 team_sheet = self.sheets[assignment]
                 self._append_row_to_sheet(team_sheet, row_data)
                 
@@ -408,12 +404,9 @@ class CQEToOursNewest:
         for col in range(1, sheet.max_column + 1):
             headers.append(sheet.cell(row=1, column=col).value or f"Column{col}")
             
-        # Get data
-        for row in range(2, sheet.max_row + 1):
-            row_data = []
-            for col in range(1, sheet.max_column + 1):
-                row_data.append(sheet.cell(row=row, column=col).value)
-            data.append(row_data)
+        # Get data in a single forward scan instead of a cell() lookup per value
+        for row_data in sheet.iter_rows(min_row=2, max_col=len(headers), values_only=True):
+            data.append(list(row_data))
             
         return pd.DataFrame(data, columns=headers)
         
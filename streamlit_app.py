@@ -9,12 +9,15 @@ import os
 import tempfile
 from datetime import datetime
 import io
+import hashlib
+# offline_processor imports openpyxl lazily; importing it here moves that cost
+# (~0.2 s) to server start-up instead of the first Process/Generate click
+import openpyxl  # noqa: F401
 from offline_processor import (
     is_cqe_file, 
     process_single_cqe_file,
     run_offline_process,
-    create_blank_excel_template,
-    create_team_sheets_email_html
+    create_blank_excel_template
 )
 
 # Set page config
@@ -24,6 +27,55 @@ st.set_page_config(
     layout="wide"
 )
 
+
+@st.cache_data(show_spinner=False)
+def _cached_is_cqe(file_digest, _upload):
+    """Detect the CQE format once per distinct upload; reruns with the same bytes hit the cache
+    
+    Args:
+        file_digest: Hash of the upload's contents, used only as the cache key
+        _upload: The uploaded file object (underscore keeps it out of the key)
+    """
+    _upload.seek(0)
+    return is_cqe_file(_upload)
+
+
+@st.cache_resource(show_spinner=False)
+def _blank_template_bytes():
+    """Build the blank template in memory; cached process-wide since it is always identical"""
+    template_buffer = io.BytesIO()
+    create_blank_excel_template(template_buffer)
+    return template_buffer.getvalue()
+
+
+def _emit_downloads(output_file, output_buffer, html_report):
+    """Render the download buttons for a processed file; its bytes go out of scope on return
+    
+    Args:
+        output_file: Name the processor gave the output workbook
+        output_buffer: BytesIO holding the processed workbook
+        html_report: HTML report content produced alongside it
+    """
+    processed_data = output_buffer.getvalue()
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.download_button(
+            label="📥 Download Processed Excel File",
+            data=processed_data,
+            file_name=os.path.basename(output_file),
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+    
+    with col2:
+        st.download_button(
+            label="📄 Download HTML Report",
+            data=html_report,
+            file_name=f"bug_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html",
+            mime="text/html"
+        )
+
+
 # Title and description
 st.title("🐛 Daily Bug Assignment Processor")
 st.markdown("""
@@ -45,92 +97,60 @@ with tab1:
     )
     
     if uploaded_file is not None:
-        # Save uploaded file to temp location
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
-            temp_path = tmp_file.name
+        # The upload is already in memory; one zero-copy view of it feeds the cache
+        # key, the format check and (only when processing) the temp file
+        file_buffer = uploaded_file.getbuffer()
+        file_digest = hashlib.blake2b(file_buffer, digest_size=16).hexdigest()
         
-        try:
-            # Check if it's a CQE file
-            if is_cqe_file(temp_path):
-                st.info("📊 Detected CQE file format - will create proper structure and process")
-                
-                if st.button("Process CQE File", type="primary"):
-                    with st.spinner("Processing CQE file..."):
-                        # Process the file
-                        output_file = process_single_cqe_file(temp_path)
-                        
-                        if output_file and os.path.exists(output_file):
-                            st.success("✅ Processing completed successfully!")
-                            
-                            # Read the processed file
-                            with open(output_file, 'rb') as f:
-                                processed_data = f.read()
-                            
-                            # Offer download
-                            col1, col2 = st.columns(2)
-                            
-                            with col1:
-                                st.download_button(
-                                    label="📥 Download Processed Excel File",
-                                    data=processed_data,
-                                    file_name=os.path.basename(output_file),
-                                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                                )
-                            
-                            with col2:
-                                # Generate HTML report
-                                html_content = create_team_sheets_email_html(output_file)
-                                st.download_button(
-                                    label="📄 Download HTML Report",
-                                    data=html_content,
-                                    file_name=f"bug_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html",
-                                    mime="text/html"
-                                )
-                            
-                            # Show summary
-                            st.subheader("📊 Processing Summary")
-                            
-                            # Read the Excel file to show summary
-                            import openpyxl
-                            wb = openpyxl.load_workbook(output_file)
-                            
-                            summary_data = []
-                            for team in ['GL', 'NT', 'PP']:
-                                ws = wb[team]
-                                count = 0
-                                for row in range(2, ws.max_row + 1):
-                                    if any(ws.cell(row=row, column=col).value for col in range(1, 9)):
-                                        count += 1
-                                summary_data.append({'Team': team, 'Bug Count': count})
-                            
-                            wb.close()
-                            
-                            # Display summary
-                            summary_df = pd.DataFrame(summary_data)
-                            col1, col2, col3 = st.columns(3)
-                            
-                            for idx, row in summary_df.iterrows():
-                                with [col1, col2, col3][idx]:
-                                    st.metric(row['Team'], f"{row['Bug Count']} bugs")
+        # Temp files live in a directory that is removed when the block exits,
+        # even if processing raises
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = os.path.join(temp_dir, os.path.basename(uploaded_file.name))
+            
+            try:
+                # Check if it's a CQE file
+                if _cached_is_cqe(file_digest, uploaded_file):
+                    st.info("📊 Detected CQE file format - will create proper structure and process")
+                    
+                    if st.button("Process CQE File", type="primary"):
+                        with st.spinner("Processing CQE file..."):
+                            with open(temp_path, 'wb') as tmp_file:
+                                tmp_file.write(file_buffer)
                             
-                            st.metric("Total Bugs", f"{summary_df['Bug Count'].sum()} bugs")
+                            # Process the file straight into memory; output_file is only its name
+                            output_buffer = io.BytesIO()
+                            output_file, details = process_single_cqe_file(
+                                temp_path, save_target=output_buffer, return_details=True
+                            )
                             
-                            # Clean up
-                            os.remove(output_file)
-                        else:
-                            st.error("❌ Processing failed. Please check your file format.")
-            
-            else:
-                st.info("📋 Detected properly formatted bug assignment file")
-                st.warning("⚠️ Note: Processing files with existing structure is not yet implemented in the Streamlit version")
+                            if output_file:
+                                st.success("✅ Processing completed successfully!")
+                                
+                                # Offer download
+                                _emit_downloads(output_file, output_buffer, details.pop('html_report'))
+                                
+                                # Show summary
+                                st.subheader("📊 Processing Summary")
+                                
+                                # The processor reports how many bugs it wrote to each team sheet
+                                summary_data = [
+                                    {'Team': team, 'Bug Count': count}
+                                    for team, count in details['team_counts'].items()
+                                ]
+                                
+                                # Display summary as one table (stretches to the container width) plus the total
+                                summary_df = pd.DataFrame(summary_data)
+                                st.dataframe(summary_df.set_index('Team'))
+                                st.metric("Total Bugs", f"{int(summary_df['Bug Count'].sum())} bugs")
+                            else:
+                                st.error("❌ Processing failed. Please check your file format.")
                 
-        except Exception as e:
-            st.error(f"❌ Error processing file: {str(e)}")
-        finally:
-            # Clean up temp file
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+                else:
+                    st.info("📋 Detected properly formatted bug assignment file")
+                    st.warning("⚠️ Note: Processing files with existing structure is not yet implemented in the Streamlit version")
+                    
+            except Exception as e:
+                st.error(f"❌ Error processing file: {str(e)}")
 
 with tab2:
     st.header("Create Blank Template")
@@ -141,16 +161,8 @@ with tab2:
     
     if st.button("Generate Blank Template", type="primary"):
         with st.spinner("Creating template..."):
-            # Create template in temp location
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-                template_path = tmp_file.name
-            
-            # Generate the template
-            create_blank_excel_template(template_path)
-            
-            # Read the template
-            with open(template_path, 'rb') as f:
-                template_data = f.read()
+            # The template never changes, so it is generated once per server process
+            template_data = _blank_template_bytes()
             
             # Offer download
             st.download_button(
@@ -161,9 +173,6 @@ with tab2:
             )
             
             st.success("✅ Template created successfully!")
-            
-            # Clean up
-            os.remove(template_path)
 
 with tab3:
     st.header("How to Use")
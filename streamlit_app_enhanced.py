@@ -6,29 +6,80 @@ Features: Historical tracking, interactive bug management, status updates
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import sqlite3
 import os
 import tempfile
+import shutil
 from datetime import datetime, timedelta
 import json
+import gzip
+import io
+import csv
 import requests
 from urllib.parse import urlparse, parse_qs
 import re
-from offline_processor import (
-    is_cqe_file, 
-    process_single_cqe_file,
-    create_blank_excel_template,
-    create_team_sheets_email_html
-)
+import threading
+import functools
+from contextlib import contextmanager
+
+# Prefer the Rust-based calamine reader when available; pandas' openpyxl reader
+# already opens workbooks read-only, so it is a fine fallback
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = 'openpyxl'
 
 # Database setup
 DB_FILE = "bug_tracker.db"
+# PRAGMA user_version of a database whose one-time data migrations have run
+DB_SCHEMA_VERSION = 1
+
+@st.cache_resource
+def _get_connection():
+    """Open the database once per server process, apply the performance PRAGMAs and create the tables"""
+    conn = sqlite3.connect(DB_FILE, check_same_thread=False)
+    # With WAL (enabled in init_database), NORMAL sync only fsyncs at checkpoints
+    conn.executescript('''
+        PRAGMA synchronous=NORMAL;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA mmap_size=268435456;
+        PRAGMA cache_size=-65536;
+    ''')
+    init_database(conn)
+    return conn
+
+@st.cache_resource
+def _database_lock():
+    """Lock shared by all sessions so only one of them uses the connection at a time"""
+    return threading.Lock()
 
-def init_database():
-    """Initialize SQLite database with required tables"""
-    conn = sqlite3.connect(DB_FILE)
+@contextmanager
+def _database():
+    """Lend the shared connection to the caller
+    
+    The connection's own context manager commits when the block finishes and
+    rolls back if it raises, so no half-done transaction is left on it. If the
+    block changed any rows, the cached read queries are cleared for every session.
+    """
+    with _database_lock(), _get_connection() as conn:
+        changes_before = conn.total_changes
+        yield conn
+        if conn.total_changes != changes_before:
+            _clear_cached_reads()
+
+def init_database(conn):
+    """Initialize SQLite database with required tables
+    
+    Args:
+        conn: Open connection to create the tables on
+    """
     cursor = conn.cursor()
     
+    # WAL is persistent in the database file, so readers no longer block writers
+    cursor.execute('PRAGMA journal_mode=WAL')
+    
     # Bugs table - stores all processed bugs with history
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS bugs (
@@ -60,7 +111,7 @@ def init_database():
             total_bugs INTEGER,
             new_bugs INTEGER,
             updated_bugs INTEGER,
-            html_report TEXT,
+            html_report BLOB,
             excel_data BLOB
         )
     ''')
@@ -98,8 +149,46 @@ def init_database():
         )
     ''')
     
+    # One row per NVbug URL. Bugs without one share a placeholder ID and stay
+    # separate rows. Databases written before imports were upserts can hold
+    # several rows for a URL, so migrate them once: keep the row whose status
+    # was changed from 'active' (else the newest) and enforce uniqueness
+    if cursor.execute('PRAGMA user_version').fetchone()[0] < DB_SCHEMA_VERSION:
+        cursor.executescript(f'''
+            BEGIN;
+            DELETE FROM bugs WHERE bug_id LIKE 'https://%' AND id NOT IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY bug_id ORDER BY status != 'active' DESC, id DESC
+                    ) AS keep_rank
+                    FROM bugs WHERE bug_id LIKE 'https://%'
+                ) WHERE keep_rank = 1
+            );
+            DROP INDEX IF EXISTS ux_bugs_bug_id;
+            CREATE UNIQUE INDEX IF NOT EXISTS ux_bugs_bug_url ON bugs(bug_id) WHERE bug_id LIKE 'https://%';
+            CREATE INDEX IF NOT EXISTS ix_bugs_bug_id ON bugs(bug_id);
+            PRAGMA user_version = {DB_SCHEMA_VERSION};
+            COMMIT;
+        ''')
+    
+    # Indexes for the status/date filters the pages run
+    cursor.executescript('''
+        CREATE INDEX IF NOT EXISTS ix_bugs_status_prio ON bugs(status, priority);
+        CREATE INDEX IF NOT EXISTS ix_inprog_status ON in_progress_bugs(status, priority);
+        CREATE INDEX IF NOT EXISTS ix_imports_date ON daily_imports(import_date);
+    ''')
+    
     conn.commit()
-    conn.close()
+
+def _compress_html(html_content):
+    """Gzip an HTML report for storage in daily_imports.html_report"""
+    return gzip.compress(html_content.encode('utf-8'))
+
+def _decompress_html(html_report):
+    """Inverse of _compress_html; reports stored before compression come back as text unchanged"""
+    if isinstance(html_report, bytes):
+        return gzip.decompress(html_report).decode('utf-8')
+    return html_report
 
 def detect_assignee_from_bug_url(bug_id):
     """Detect assignee from bug URL content by checking for team member names"""
@@ -138,128 +227,364 @@ def count_comments_from_bug_url(bug_id):
     # In real version, you'd parse the bug page and count comments
     return 0
 
+@functools.lru_cache(maxsize=4096)
+def _probe_bug_url(bug_id, probe_date):
+    """Detect assignee and comment count for a bug URL, at most once per bug per day
+    
+    Args:
+        bug_id: Bug URL to probe
+        probe_date: Date the result is valid for; a new day probes again so
+                    comment counts (which drive bug age) stay current
+    """
+    return detect_assignee_from_bug_url(bug_id), count_comments_from_bug_url(bug_id)
+
+# Sheet columns saved for each bug, in bugs table order, with the value used
+# when an imported sheet lacks the column
+BUG_COLUMN_DEFAULTS = {
+    'Bug ID': '', 'Assignment': '', 'Priority': 0, 'Title': '', 'Failure Mode': '',
+    'Created Date': '', 'COMPLETED': '', 'SN Associated': '', 'Product': ''
+}
+
 def save_bugs_to_database(bugs_df, import_date=None):
     """Save processed bugs to database with duplicate handling"""
     if import_date is None:
         import_date = datetime.now().date()
     
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
+    # Saved columns in table order, with defaults for any the sheet lacks
+    bug_columns = pd.DataFrame({
+        column: bugs_df[column] if column in bugs_df.columns else default
+        for column, default in BUG_COLUMN_DEFAULTS.items()
+    }, index=bugs_df.index)
+    
+    # Check which of the imported bugs already exist with a single query
+    bug_ids = bug_columns['Bug ID']
+    with _database() as conn:
+        known_ids = pd.read_sql_query(
+            f"SELECT DISTINCT bug_id FROM bugs WHERE bug_id IN ({','.join('?' * len(bug_ids))})",
+            conn, params=bug_ids.tolist()
+        )['bug_id']
+    
+    # bug_id has TEXT affinity, so match on the text form SQLite stores; a bug
+    # URL repeated later in this import counts as an update, as it did row by
+    # row. Rows without a URL are always inserted, so they are always new
+    id_keys = bug_ids.astype(str).where(bug_ids.notna())
+    is_url = id_keys.str.lower().str.startswith('https://').fillna(False).astype(bool)
+    is_existing = is_url & (id_keys.isin(known_ids) | id_keys.duplicated())
+    
+    # Detect assignee and comment count; repeated bugs and same-day re-imports hit the cache
+    # (the probes do no I/O yet; run them on a thread pool once they fetch bug pages)
+    probes = [_probe_bug_url(bug_id, import_date) for bug_id in bug_ids]
+    assignees = [assignee for assignee, _ in probes]
+    comment_counts = np.array([comment_count for _, comment_count in probes], dtype=int)
+    
+    # Determine bug age for all rows at once
+    bug_ages = np.select(
+        [~is_existing.to_numpy(), comment_counts >= 2, comment_counts > 0],
+        ['brand_new', 'existing_multiple_comments', 'existing_one_comment'],
+        default='existing_untouched'
+    )
+    new_bugs = int((~is_existing).sum())
+    updated_bugs = len(bugs_df) - new_bugs
     
-    new_bugs = 0
-    updated_bugs = 0
+    rows = [
+        (*bug, import_date, assignee, comment_count, bug_age)
+        for bug, assignee, comment_count, bug_age in zip(
+            bug_columns.itertuples(index=False, name=None), assignees, comment_counts.tolist(), bug_ages.tolist()
+        )
+    ]
     
-    for _, bug in bugs_df.iterrows():
-        bug_id = bug.get('Bug ID', '')
-        
-        # Check if bug already exists
-        cursor.execute('SELECT id, bug_age FROM bugs WHERE bug_id = ?', (bug_id,))
-        existing = cursor.fetchone()
-        
-        # Detect assignee and comment count
-        assignee = detect_assignee_from_bug_url(bug_id)
-        comment_count = count_comments_from_bug_url(bug_id)
-        
-        # Determine bug age
-        if existing:
-            bug_age = existing[1]  # Keep existing age
-            if comment_count > 0:
-                if comment_count >= 2:
-                    bug_age = 'existing_multiple_comments'
-                else:
-                    bug_age = 'existing_one_comment'
-            else:
-                bug_age = 'existing_untouched'
-            updated_bugs += 1
-        else:
-            bug_age = 'brand_new'
-            new_bugs += 1
-        
-        # Insert or update bug
-        cursor.execute('''
-            INSERT OR REPLACE INTO bugs 
+    # Insert new bugs and update known bug URLs in place, all in one batch;
+    # the conflict target matches the partial unique index on URL bug_ids
+    with _database() as conn:
+        conn.executemany('''
+            INSERT INTO bugs 
             (bug_id, assignment, priority, title, failure_mode, created_date, 
              completed, sn_associated, product, import_date, assignee_detected, 
              comment_count, bug_age, last_updated)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-        ''', (
-            bug_id,
-            bug.get('Assignment', ''),
-            bug.get('Priority', 0),
-            bug.get('Title', ''),
-            bug.get('Failure Mode', ''),
-            bug.get('Created Date', ''),
-            bug.get('COMPLETED', ''),
-            bug.get('SN Associated', ''),
-            bug.get('Product', ''),
-            import_date,
-            assignee,
-            comment_count,
-            bug_age
-        ))
-    
-    conn.commit()
-    conn.close()
+            ON CONFLICT(bug_id) WHERE bug_id LIKE 'https://%' DO UPDATE SET
+                assignment = excluded.assignment,
+                priority = excluded.priority,
+                title = excluded.title,
+                failure_mode = excluded.failure_mode,
+                created_date = excluded.created_date,
+                completed = excluded.completed,
+                sn_associated = excluded.sn_associated,
+                product = excluded.product,
+                import_date = excluded.import_date,
+                assignee_detected = excluded.assignee_detected,
+                comment_count = excluded.comment_count,
+                bug_age = excluded.bug_age,
+                last_updated = CURRENT_TIMESTAMP
+        ''', rows)
+        conn.commit()
     
     return new_bugs, updated_bugs
 
+@st.cache_data(ttl=60)
 def get_historical_data(days_back=30):
     """Get historical bug data"""
-    conn = sqlite3.connect(DB_FILE)
-    
-    # Get daily imports
-    imports_df = pd.read_sql_query('''
-        SELECT import_date, total_bugs, new_bugs, updated_bugs, html_report
-        FROM daily_imports 
-        WHERE import_date >= date('now', '-{} days')
-        ORDER BY import_date DESC
-    '''.format(days_back), conn)
-    
-    conn.close()
+    with _database() as conn:
+        # Get daily imports
+        imports_df = pd.read_sql_query('''
+            SELECT id, import_date, total_bugs, new_bugs, updated_bugs
+            FROM daily_imports 
+            WHERE import_date >= date('now', ?)
+            ORDER BY import_date DESC
+        ''', conn, params=(f'-{int(days_back)} days',))
     return imports_df
 
+@st.cache_data(ttl=60)
+def get_html_report(import_id):
+    """Get the HTML report of a single import, fetched only when it is viewed"""
+    with _database() as conn:
+        row = conn.execute('SELECT html_report FROM daily_imports WHERE id = ?', (import_id,)).fetchone()
+    return _decompress_html(row[0]) if row else None
+
+@st.cache_data(ttl=60)
 def get_bugs_by_status(status='active'):
-    """Get bugs by status"""
-    conn = sqlite3.connect(DB_FILE)
-    
-    df = pd.read_sql_query('''
-        SELECT * FROM bugs 
-        WHERE status = ? 
-        ORDER BY priority ASC, last_updated DESC
-    ''', conn, params=(status,))
-    
-    conn.close()
+    """Get bugs by status, with the columns the dashboard cards use"""
+    with _database() as conn:
+        df = pd.read_sql_query('''
+            SELECT id, bug_id, assignment, priority, title, failure_mode, created_date,
+                   completed, sn_associated, product, assignee_detected, bug_age
+            FROM bugs 
+            WHERE status = ? 
+            ORDER BY priority ASC, last_updated DESC
+        ''', conn, params=(status,))
+    return df
+
+@st.cache_data(ttl=60)
+def get_in_progress_bugs():
+    """Get bugs currently in progress"""
+    with _database() as conn:
+        df = pd.read_sql_query('''
+            SELECT id, bug_id, assignment, priority, title, failure_mode, status, user_notes
+            FROM in_progress_bugs 
+            WHERE status = 'in_progress'
+            ORDER BY priority ASC
+        ''', conn)
     return df
 
+@st.cache_data(ttl=60)
+def get_completed_bugs():
+    """Get completed bugs, most recent first"""
+    with _database() as conn:
+        df = pd.read_sql_query('''
+            SELECT bug_id, assignment, priority, title, failure_mode, product,
+                   added_date, user_notes, assignee_detected
+            FROM in_progress_bugs 
+            WHERE status = 'completed'
+            ORDER BY id DESC
+        ''', conn)
+    return df
+
+@st.cache_data(ttl=60)
+def get_database_counts():
+    """Get the row counts shown on the Settings page"""
+    with _database() as conn:
+        return conn.execute('''
+            SELECT (SELECT COUNT(*) FROM bugs),
+                   (SELECT COUNT(*) FROM daily_imports),
+                   (SELECT COUNT(*) FROM user_interactions)
+        ''').fetchone()
+
+def export_table_csv(table, converters=None, chunksize=5000):
+    """Export a table as CSV bytes, streaming rows from SQLite one chunk at a time
+    
+    Args:
+        table: Name of the table to export
+        converters: Optional dict of column name to function applied to its values
+        chunksize: Number of rows fetched from SQLite at once
+    """
+    output = io.BytesIO()
+    text = io.TextIOWrapper(output, encoding='utf-8', newline='')
+    writer = csv.writer(text, lineterminator='\n')
+    with _database() as conn:
+        cursor = conn.execute(f'SELECT * FROM {table}')
+        columns = [description[0] for description in cursor.description]
+        convert = [(columns.index(name), func) for name, func in (converters or {}).items()]
+        writer.writerow(columns)
+        while rows := cursor.fetchmany(chunksize):
+            for row in rows:
+                row = list(row)
+                for index, func in convert:
+                    row[index] = func(row[index])
+                writer.writerow(row)
+    text.flush()
+    text.detach()
+    return output.getvalue()
+
+def _clear_cached_reads():
+    """Drop the memoized query results after a write so every page sees it"""
+    for reader in (get_historical_data, get_html_report, get_bugs_by_status,
+                   get_in_progress_bugs, get_completed_bugs, get_database_counts):
+        reader.clear()
+
 def update_bug_status(bug_id, new_status, user_notes=''):
     """Update bug status with user interaction tracking"""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
+    with _database() as conn:
+        cursor = conn.cursor()
+        
+        # Get current status
+        cursor.execute('SELECT status FROM bugs WHERE bug_id = ?', (bug_id,))
+        result = cursor.fetchone()
+        old_status = result[0] if result else 'unknown'
+        
+        # Update bug status
+        cursor.execute('''
+            UPDATE bugs 
+            SET status = ?, last_updated = CURRENT_TIMESTAMP 
+            WHERE bug_id = ?
+        ''', (new_status, bug_id))
+        
+        # Log user interaction
+        cursor.execute('''
+            INSERT INTO user_interactions 
+            (bug_id, action, old_status, new_status, user_notes)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (bug_id, 'status_change', old_status, new_status, user_notes))
+        
+        conn.commit()
+
+def queue_bug_age_update(row_id, current_age):
+    """Remember a dashboard Bug Status change until it is saved with the others
+    
+    Args:
+        row_id: Row id of the bug in the bugs table
+        current_age: Bug age stored in the database, to drop changes that are undone
+    """
+    pending_updates = st.session_state.setdefault('pending_updates', {})
+    new_age = st.session_state[f"age_{row_id}"]
+    if new_age == current_age:
+        pending_updates.pop(row_id, None)
+    else:
+        pending_updates[row_id] = new_age
+
+def save_pending_updates():
+    """Write every queued Bug Status change in a single transaction"""
+    pending_updates = st.session_state.pop('pending_updates', {})
+    with _database() as conn:
+        conn.executemany('UPDATE bugs SET bug_age = ? WHERE id = ?',
+                         [(new_age, row_id) for row_id, new_age in pending_updates.items()])
+        conn.commit()
+    return len(pending_updates)
+
+@st.fragment
+def _render_bug_card(bug):
+    """Render one dashboard bug card; its widgets rerun only this card
+    
+    Args:
+        bug: Row of the bugs table
+    """
+    with st.expander(f"🐛 {bug['bug_id']} - Priority {bug['priority']} - {bug['title'][:50]}..."):
+        col1, col2, col3 = st.columns([2, 1, 1])
+        
+        with col1:
+            st.write(f"**Assignment:** {bug['assignment']}")
+            st.write(f"**Failure Mode:** {bug['failure_mode']}")
+            st.write(f"**Product:** {bug['product']}")
+            st.write(f"**Bug Age:** {bug['bug_age'].replace('_', ' ').title()}")
+            if bug['assignee_detected']:
+                st.write(f"**Detected Assignee:** {bug['assignee_detected']}")
+        
+        with col2:
+            # Bug age dropdown
+            current_age = bug['bug_age']
+            new_age = st.selectbox(
+                "Bug Status",
+                ['brand_new', 'existing_untouched', 'existing_one_comment', 'existing_multiple_comments'],
+                index=['brand_new', 'existing_untouched', 'existing_one_comment', 'existing_multiple_comments'].index(current_age),
+                key=f"age_{bug['id']}",
+                on_change=queue_bug_age_update,
+                args=(int(bug['id']), current_age)
+            )
+            
+            if new_age != current_age:
+                st.caption("Unsaved change")
+        
+        with col3:
+            # Action buttons
+            if st.button("🔄 Move to In Progress", key=f"progress_{bug['id']}"):
+                # Move to in_progress_bugs table
+                with _database() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute('''
+                        INSERT INTO in_progress_bugs 
+                        (bug_id, assignment, priority, title, failure_mode, created_date, 
+                         completed, sn_associated, product, added_date, assignee_detected)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, date('now'), ?)
+                    ''', (bug['bug_id'], bug['assignment'], bug['priority'], bug['title'],
+                          bug['failure_mode'], bug['created_date'], bug['completed'],
+                          bug['sn_associated'], bug['product'], bug['assignee_detected']))
+                    
+                    # Update main bugs table
+                    cursor.execute('UPDATE bugs SET status = ? WHERE id = ?', ('in_progress', bug['id']))
+                    conn.commit()
+                
+                st.success("Moved to In Progress!")
+                st.rerun()
+            
+            if st.button("⏸️ Deprioritize", key=f"deprio_{bug['id']}"):
+                update_bug_status(bug['bug_id'], 'deprioritized')
+                st.success("Bug deprioritized!")
+                st.rerun()
+
+@st.fragment
+def _render_in_progress_card(bug):
+    """Render one In Progress bug card; its widgets rerun only this card
+    
+    Args:
+        bug: Row of the in_progress_bugs table
+    """
+    # Color coding based on status
+    if bug['status'] == 'deprioritized':
+        st.markdown(f'<div style="background-color: #f0f0f0; padding: 10px; border-radius: 5px; margin: 5px 0;">', unsafe_allow_html=True)
+    else:
+        st.markdown(f'<div style="background-color: #e8f4fd; padding: 10px; border-radius: 5px; margin: 5px 0;">', unsafe_allow_html=True)
     
-    # Get current status
-    cursor.execute('SELECT status FROM bugs WHERE bug_id = ?', (bug_id,))
-    result = cursor.fetchone()
-    old_status = result[0] if result else 'unknown'
+    col1, col2, col3 = st.columns([3, 1, 1])
     
-    # Update bug status
-    cursor.execute('''
-        UPDATE bugs 
-        SET status = ?, last_updated = CURRENT_TIMESTAMP 
-        WHERE bug_id = ?
-    ''', (new_status, bug_id))
+    with col1:
+        st.write(f"**🐛 {bug['bug_id']}** - Priority {bug['priority']}")
+        st.write(f"**Title:** {bug['title']}")
+        st.write(f"**Assignment:** {bug['assignment']} | **Failure Mode:** {bug['failure_mode']}")
+        if bug['user_notes']:
+            st.write(f"**Notes:** {bug['user_notes']}")
     
-    # Log user interaction
-    cursor.execute('''
-        INSERT INTO user_interactions 
-        (bug_id, action, old_status, new_status, user_notes)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (bug_id, 'status_change', old_status, new_status, user_notes))
+    with col2:
+        # Edit notes
+        new_notes = st.text_area("Update Notes", value=bug['user_notes'] or '', key=f"notes_{bug['id']}")
+        if st.button("💾 Save Notes", key=f"save_notes_{bug['id']}"):
+            with _database() as conn:
+                cursor = conn.cursor()
+                cursor.execute('UPDATE in_progress_bugs SET user_notes = ? WHERE id = ?', (new_notes, bug['id']))
+                conn.commit()
+            st.success("Notes updated!")
+            st.rerun()
     
-    conn.commit()
-    conn.close()
-
-# Initialize database
-init_database()
+    with col3:
+        # Action buttons
+        if st.button("🔴 Deprioritize", key=f"deprio_prog_{bug['id']}"):
+            with _database() as conn:
+                cursor = conn.cursor()
+                cursor.execute('UPDATE in_progress_bugs SET status = ? WHERE id = ?', ('deprioritized', bug['id']))
+                conn.commit()
+            st.rerun()
+        
+        if st.button("✅ Complete", key=f"complete_{bug['id']}"):
+            # Move to completed
+            with _database() as conn:
+                cursor = conn.cursor()
+                cursor.execute('UPDATE in_progress_bugs SET status = ? WHERE id = ?', ('completed', bug['id']))
+                
+                # Also update main bugs table if exists
+                cursor.execute('UPDATE bugs SET status = ? WHERE bug_id = ?', ('completed', bug['bug_id']))
+                conn.commit()
+            st.success("Bug completed!")
+            st.rerun()
+    
+    st.markdown('</div>', unsafe_allow_html=True)
 
 # Set page config
 st.set_page_config(
@@ -270,13 +595,12 @@ st.set_page_config(
 
 # Sidebar navigation
 st.sidebar.title("🐛 Bug Tracker")
-page = st.sidebar.selectbox(
-    "Navigate",
-    ["📥 Import New Bugs", "📊 Current Dashboard", "📅 Historical View", 
-     "🔄 In Progress", "✅ Completed", "⚙️ Settings"]
-)
 
-if page == "📥 Import New Bugs":
+def import_page():
+    """Process an uploaded CQE file and record its bugs and report"""
+    # The Excel processing module (and openpyxl with it) is only needed here
+    from offline_processor import is_cqe_file, process_single_cqe_file, create_team_sheets_email_html
+    
     st.title("📥 Import New CQE Bugs")
     st.markdown("Upload your CQE Excel file to process and store bugs with historical tracking.")
     
@@ -290,7 +614,9 @@ if page == "📥 Import New Bugs":
     if uploaded_file is not None:
         # Save uploaded file to temp location
         with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
+            # Copy in 1 MB chunks rather than duplicating the whole upload in memory
+            uploaded_file.seek(0)
+            shutil.copyfileobj(uploaded_file, tmp_file, length=1024 * 1024)
             temp_path = tmp_file.name
         
         try:
@@ -304,20 +630,11 @@ if page == "📥 Import New Bugs":
                         output_file = process_single_cqe_file(temp_path)
                         
                         if output_file and os.path.exists(output_file):
-                            # Read processed data
-                            import openpyxl
-                            wb = openpyxl.load_workbook(output_file)
-                            daily_sheet = wb['Daily New']
-                            
-                            # Convert to DataFrame
-                            data = []
-                            headers = [cell.value for cell in daily_sheet[1]]
-                            for row in daily_sheet.iter_rows(min_row=2, values_only=True):
-                                if any(row):  # Skip empty rows
-                                    data.append(row)
-                            
-                            bugs_df = pd.DataFrame(data, columns=headers)
-                            wb.close()
+                            # Read processed data; object dtype keeps the cell values as
+                            # written (no int-to-float promotion), empty rows are dropped
+                            bugs_df = pd.read_excel(
+                                output_file, sheet_name='Daily New', engine=EXCEL_ENGINE, dtype=object
+                            ).dropna(how='all')
                             
                             # Save to database
                             new_bugs, updated_bugs = save_bugs_to_database(bugs_df)
@@ -326,15 +643,14 @@ if page == "📥 Import New Bugs":
                             html_content = create_team_sheets_email_html(output_file)
                             
                             # Save import session
-                            conn = sqlite3.connect(DB_FILE)
-                            cursor = conn.cursor()
-                            cursor.execute('''
-                                INSERT INTO daily_imports 
-                                (import_date, total_bugs, new_bugs, updated_bugs, html_report)
-                                VALUES (date('now'), ?, ?, ?, ?)
-                            ''', (len(bugs_df), new_bugs, updated_bugs, html_content))
-                            conn.commit()
-                            conn.close()
+                            with _database() as conn:
+                                cursor = conn.cursor()
+                                cursor.execute('''
+                                    INSERT INTO daily_imports 
+                                    (import_date, total_bugs, new_bugs, updated_bugs, html_report)
+                                    VALUES (date('now'), ?, ?, ?, ?)
+                                ''', (len(bugs_df), new_bugs, updated_bugs, _compress_html(html_content)))
+                                conn.commit()
                             
                             st.success("✅ Processing completed successfully!")
                             st.info(f"📊 **Import Summary:**\n- Total bugs: {len(bugs_df)}\n- New bugs: {new_bugs}\n- Updated bugs: {updated_bugs}")
@@ -376,7 +692,8 @@ if page == "📥 Import New Bugs":
             if os.path.exists(temp_path):
                 os.remove(temp_path)
 
-elif page == "📊 Current Dashboard":
+def dashboard_page():
+    """Show the active bugs with their status and actions"""
     st.title("📊 Current Bug Dashboard")
     
     # Get current active bugs
@@ -385,70 +702,22 @@ elif page == "📊 Current Dashboard":
     if not active_bugs.empty:
         st.info(f"📋 Showing {len(active_bugs)} active bugs")
         
+        # Bug Status changes are queued below and written together; the cards
+        # rerun on their own, so this button is always shown rather than
+        # appearing only once something is pending
+        if st.button("💾 Save All Status Changes", type="primary"):
+            saved = save_pending_updates()
+            st.success(f"{saved} statuses updated!")
+            st.rerun()
+        
         # Display bugs with interactive controls
-        for idx, bug in active_bugs.iterrows():
-            with st.expander(f"🐛 {bug['bug_id']} - Priority {bug['priority']} - {bug['title'][:50]}..."):
-                col1, col2, col3 = st.columns([2, 1, 1])
-                
-                with col1:
-                    st.write(f"**Assignment:** {bug['assignment']}")
-                    st.write(f"**Failure Mode:** {bug['failure_mode']}")
-                    st.write(f"**Product:** {bug['product']}")
-                    st.write(f"**Bug Age:** {bug['bug_age'].replace('_', ' ').title()}")
-                    if bug['assignee_detected']:
-                        st.write(f"**Detected Assignee:** {bug['assignee_detected']}")
-                
-                with col2:
-                    # Bug age dropdown
-                    current_age = bug['bug_age']
-                    new_age = st.selectbox(
-                        "Bug Status",
-                        ['brand_new', 'existing_untouched', 'existing_one_comment', 'existing_multiple_comments'],
-                        index=['brand_new', 'existing_untouched', 'existing_one_comment', 'existing_multiple_comments'].index(current_age),
-                        key=f"age_{bug['id']}"
-                    )
-                    
-                    if new_age != current_age:
-                        if st.button(f"Update Status", key=f"update_{bug['id']}"):
-                            conn = sqlite3.connect(DB_FILE)
-                            cursor = conn.cursor()
-                            cursor.execute('UPDATE bugs SET bug_age = ? WHERE id = ?', (new_age, bug['id']))
-                            conn.commit()
-                            conn.close()
-                            st.success("Status updated!")
-                            st.experimental_rerun()
-                
-                with col3:
-                    # Action buttons
-                    if st.button("🔄 Move to In Progress", key=f"progress_{bug['id']}"):
-                        # Move to in_progress_bugs table
-                        conn = sqlite3.connect(DB_FILE)
-                        cursor = conn.cursor()
-                        cursor.execute('''
-                            INSERT INTO in_progress_bugs 
-                            (bug_id, assignment, priority, title, failure_mode, created_date, 
-                             completed, sn_associated, product, added_date, assignee_detected)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, date('now'), ?)
-                        ''', (bug['bug_id'], bug['assignment'], bug['priority'], bug['title'],
-                              bug['failure_mode'], bug['created_date'], bug['completed'],
-                              bug['sn_associated'], bug['product'], bug['assignee_detected']))
-                        
-                        # Update main bugs table
-                        cursor.execute('UPDATE bugs SET status = ? WHERE id = ?', ('in_progress', bug['id']))
-                        conn.commit()
-                        conn.close()
-                        
-                        st.success("Moved to In Progress!")
-                        st.experimental_rerun()
-                    
-                    if st.button("⏸️ Deprioritize", key=f"deprio_{bug['id']}"):
-                        update_bug_status(bug['bug_id'], 'deprioritized')
-                        st.success("Bug deprioritized!")
-                        st.experimental_rerun()
+        for _, bug in active_bugs.iterrows():
+            _render_bug_card(bug)
     else:
         st.info("No active bugs found. Import some bugs to get started!")
 
-elif page == "📅 Historical View":
+def historical_page():
+    """Show past imports and their HTML reports"""
     st.title("📅 Historical Bug Reports")
     
     # Date range selector
@@ -473,33 +742,32 @@ elif page == "📅 Historical View":
                 with col3:
                     st.metric("Updated Bugs", import_record['updated_bugs'])
                 
-                # Show HTML report if available
-                if import_record['html_report']:
-                    st.subheader("📄 HTML Report")
-                    st.components.v1.html(import_record['html_report'], height=600, scrolling=True)
+                # Expander bodies always run, so the report is only fetched once asked for
+                if st.toggle("📄 Show HTML Report", key=f"show_report_{import_record['id']}"):
+                    html_report = get_html_report(int(import_record['id']))
                     
-                    # Download option
-                    st.download_button(
-                        label="📥 Download HTML Report",
-                        data=import_record['html_report'],
-                        file_name=f"bug_report_{import_record['import_date']}.html",
-                        mime="text/html",
-                        key=f"download_{import_record['import_date']}"
-                    )
+                    # Show HTML report if available
+                    if html_report:
+                        st.subheader("📄 HTML Report")
+                        st.components.v1.html(html_report, height=600, scrolling=True)
+                        
+                        # Download option
+                        st.download_button(
+                            label="📥 Download HTML Report",
+                            data=html_report,
+                            file_name=f"bug_report_{import_record['import_date']}.html",
+                            mime="text/html",
+                            key=f"download_{import_record['id']}"
+                        )
     else:
         st.info("No historical data found.")
 
-elif page == "🔄 In Progress":
+def in_progress_page():
+    """Show and manage the bugs being worked on"""
     st.title("🔄 In Progress Bugs")
     
     # Get in-progress bugs
-    conn = sqlite3.connect(DB_FILE)
-    in_progress_df = pd.read_sql_query('''
-        SELECT * FROM in_progress_bugs 
-        WHERE status = 'in_progress'
-        ORDER BY priority ASC
-    ''', conn)
-    conn.close()
+    in_progress_df = get_in_progress_bugs()
     
     # Add new bug section
     with st.expander("➕ Add New Bug to In Progress"):
@@ -520,19 +788,18 @@ elif page == "🔄 In Progress":
             
             if st.form_submit_button("Add Bug"):
                 if new_bug_id and new_title:
-                    conn = sqlite3.connect(DB_FILE)
-                    cursor = conn.cursor()
-                    cursor.execute('''
-                        INSERT INTO in_progress_bugs 
-                        (bug_id, assignment, priority, title, failure_mode, 
-                         sn_associated, product, added_date, user_notes)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, date('now'), ?)
-                    ''', (new_bug_id, new_assignment, new_priority, new_title,
-                          new_failure_mode, new_sn, new_product, new_notes))
-                    conn.commit()
-                    conn.close()
+                    with _database() as conn:
+                        cursor = conn.cursor()
+                        cursor.execute('''
+                            INSERT INTO in_progress_bugs 
+                            (bug_id, assignment, priority, title, failure_mode, 
+                             sn_associated, product, added_date, user_notes)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, date('now'), ?)
+                        ''', (new_bug_id, new_assignment, new_priority, new_title,
+                              new_failure_mode, new_sn, new_product, new_notes))
+                        conn.commit()
                     st.success("Bug added to In Progress!")
-                    st.experimental_rerun()
+                    st.rerun()
                 else:
                     st.error("Bug ID and Title are required!")
     
@@ -540,72 +807,17 @@ elif page == "🔄 In Progress":
     if not in_progress_df.empty:
         st.info(f"📋 Showing {len(in_progress_df)} in-progress bugs")
         
-        for idx, bug in in_progress_df.iterrows():
-            # Color coding based on status
-            if bug['status'] == 'deprioritized':
-                st.markdown(f'<div style="background-color: #f0f0f0; padding: 10px; border-radius: 5px; margin: 5px 0;">', unsafe_allow_html=True)
-            else:
-                st.markdown(f'<div style="background-color: #e8f4fd; padding: 10px; border-radius: 5px; margin: 5px 0;">', unsafe_allow_html=True)
-            
-            col1, col2, col3 = st.columns([3, 1, 1])
-            
-            with col1:
-                st.write(f"**🐛 {bug['bug_id']}** - Priority {bug['priority']}")
-                st.write(f"**Title:** {bug['title']}")
-                st.write(f"**Assignment:** {bug['assignment']} | **Failure Mode:** {bug['failure_mode']}")
-                if bug['user_notes']:
-                    st.write(f"**Notes:** {bug['user_notes']}")
-            
-            with col2:
-                # Edit notes
-                new_notes = st.text_area("Update Notes", value=bug['user_notes'] or '', key=f"notes_{bug['id']}")
-                if st.button("💾 Save Notes", key=f"save_notes_{bug['id']}"):
-                    conn = sqlite3.connect(DB_FILE)
-                    cursor = conn.cursor()
-                    cursor.execute('UPDATE in_progress_bugs SET user_notes = ? WHERE id = ?', (new_notes, bug['id']))
-                    conn.commit()
-                    conn.close()
-                    st.success("Notes updated!")
-                    st.experimental_rerun()
-            
-            with col3:
-                # Action buttons
-                if st.button("🔴 Deprioritize", key=f"deprio_prog_{bug['id']}"):
-                    conn = sqlite3.connect(DB_FILE)
-                    cursor = conn.cursor()
-                    cursor.execute('UPDATE in_progress_bugs SET status = ? WHERE id = ?', ('deprioritized', bug['id']))
-                    conn.commit()
-                    conn.close()
-                    st.experimental_rerun()
-                
-                if st.button("✅ Complete", key=f"complete_{bug['id']}"):
-                    # Move to completed
-                    conn = sqlite3.connect(DB_FILE)
-                    cursor = conn.cursor()
-                    cursor.execute('UPDATE in_progress_bugs SET status = ? WHERE id = ?', ('completed', bug['id']))
-                    
-                    # Also update main bugs table if exists
-                    cursor.execute('UPDATE bugs SET status = ? WHERE bug_id = ?', ('completed', bug['bug_id']))
-                    conn.commit()
-                    conn.close()
-                    st.success("Bug completed!")
-                    st.experimental_rerun()
-            
-            st.markdown('</div>', unsafe_allow_html=True)
+        for _, bug in in_progress_df.iterrows():
+            _render_in_progress_card(bug)
     else:
         st.info("No bugs in progress. Add some bugs or move them from the dashboard!")
 
-elif page == "✅ Completed":
+def completed_page():
+    """Show the completed bugs"""
     st.title("✅ Completed Bugs")
     
     # Get completed bugs
-    conn = sqlite3.connect(DB_FILE)
-    completed_df = pd.read_sql_query('''
-        SELECT * FROM in_progress_bugs 
-        WHERE status = 'completed'
-        ORDER BY id DESC
-    ''', conn)
-    conn.close()
+    completed_df = get_completed_bugs()
     
     if not completed_df.empty:
         st.success(f"🎉 {len(completed_df)} bugs completed!")
@@ -639,15 +851,12 @@ elif page == "✅ Completed":
     else:
         st.info("No completed bugs yet. Complete some bugs from the In Progress section!")
 
-elif page == "⚙️ Settings":
+def settings_page():
+    """Show database statistics, export and reset"""
     st.title("⚙️ Settings & Database Management")
     
     # Database statistics
-    conn = sqlite3.connect(DB_FILE)
-    
-    bugs_count = pd.read_sql_query('SELECT COUNT(*) as count FROM bugs', conn).iloc[0]['count']
-    imports_count = pd.read_sql_query('SELECT COUNT(*) as count FROM daily_imports', conn).iloc[0]['count']
-    interactions_count = pd.read_sql_query('SELECT COUNT(*) as count FROM user_interactions', conn).iloc[0]['count']
+    bugs_count, imports_count, interactions_count = get_database_counts()
     
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -657,8 +866,6 @@ elif page == "⚙️ Settings":
     with col3:
         st.metric("User Interactions", interactions_count)
     
-    conn.close()
-    
     # Database actions
     st.subheader("🗄️ Database Actions")
     
@@ -667,27 +874,22 @@ elif page == "⚙️ Settings":
     with col1:
         if st.button("📊 Export All Data"):
             # Export all tables to CSV
-            conn = sqlite3.connect(DB_FILE)
-            
-            bugs_df = pd.read_sql_query('SELECT * FROM bugs', conn)
-            imports_df = pd.read_sql_query('SELECT * FROM daily_imports', conn)
-            interactions_df = pd.read_sql_query('SELECT * FROM user_interactions', conn)
-            
-            conn.close()
+            bugs_csv = export_table_csv('bugs')
+            imports_csv = export_table_csv('daily_imports', converters={'html_report': _decompress_html})
             
             # Create downloadable files
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             
             st.download_button(
                 "📥 Download Bugs Data",
-                bugs_df.to_csv(index=False),
+                bugs_csv,
                 f"bugs_export_{timestamp}.csv",
                 "text/csv"
             )
             
             st.download_button(
                 "📥 Download Import History",
-                imports_df.to_csv(index=False),
+                imports_csv,
                 f"imports_export_{timestamp}.csv",
                 "text/csv"
             )
@@ -696,16 +898,26 @@ elif page == "⚙️ Settings":
         st.warning("⚠️ Danger Zone")
         if st.button("🗑️ Clear All Data", type="secondary"):
             if st.checkbox("I understand this will delete all data"):
-                conn = sqlite3.connect(DB_FILE)
-                cursor = conn.cursor()
-                cursor.execute('DELETE FROM bugs')
-                cursor.execute('DELETE FROM daily_imports')
-                cursor.execute('DELETE FROM user_interactions')
-                cursor.execute('DELETE FROM in_progress_bugs')
-                conn.commit()
-                conn.close()
+                with _database() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute('DELETE FROM bugs')
+                    cursor.execute('DELETE FROM daily_imports')
+                    cursor.execute('DELETE FROM user_interactions')
+                    cursor.execute('DELETE FROM in_progress_bugs')
+                    conn.commit()
                 st.success("All data cleared!")
-                st.experimental_rerun()
+                st.rerun()
+
+# Only the selected page's function runs on each rerun
+page = st.navigation([
+    st.Page(import_page, title="Import New Bugs", icon="📥"),
+    st.Page(dashboard_page, title="Current Dashboard", icon="📊"),
+    st.Page(historical_page, title="Historical View", icon="📅"),
+    st.Page(in_progress_page, title="In Progress", icon="🔄"),
+    st.Page(completed_page, title="Completed", icon="✅"),
+    st.Page(settings_page, title="Settings", icon="⚙️"),
+])
+page.run()
 
 # Footer
 st.sidebar.markdown("---")
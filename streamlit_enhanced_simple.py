@@ -3,6 +3,7 @@ import pandas as pd
 import sqlite3
 import os
 import tempfile
+import shutil
 from datetime import datetime
 from offline_processor import is_cqe_file, process_single_cqe_file, create_team_sheets_email_html
 
@@ -39,19 +40,26 @@ def init_database():
     conn.commit()
     conn.close()
 
+# Sheet columns saved for each bug, with the value used when the sheet lacks one
+BUG_COLUMN_DEFAULTS = {'Bug ID': '', 'Assignment': '', 'Priority': 0, 'Title': '', 'Failure Mode': ''}
+
 def save_bugs_to_db(df):
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
+    bugs = pd.DataFrame({
+        column: df[column] if column in df.columns else default
+        for column, default in BUG_COLUMN_DEFAULTS.items()
+    }, index=df.index)
     
-    for _, row in df.iterrows():
-        bug_id = row.get('Bug ID', '')
-        if bug_id:
-            cursor.execute('''
-                INSERT OR REPLACE INTO bugs 
-                (bug_id, assignment, priority, title, failure_mode, import_date)
-                VALUES (?, ?, ?, ?, ?, date('now'))
-            ''', (bug_id, row.get('Assignment', ''), row.get('Priority', 0),
-                  row.get('Title', ''), row.get('Failure Mode', '')))
+    # Only rows with a Bug ID are saved
+    bug_ids = bugs['Bug ID']
+    bugs = bugs[bug_ids.notna() & bug_ids.astype(bool)]
+    
+    # One statement for all rows, inside the single transaction sqlite3 opens
+    conn = sqlite3.connect(DB_FILE)
+    conn.executemany('''
+        INSERT OR REPLACE INTO bugs 
+        (bug_id, assignment, priority, title, failure_mode, import_date)
+        VALUES (?, ?, ?, ?, ?, date('now'))
+    ''', bugs.itertuples(index=False, name=None))
     
     conn.commit()
     conn.close()
@@ -70,7 +78,9 @@ if page == "Import":
     
     if uploaded_file:
         with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp:
-            tmp.write(uploaded_file.getvalue())
+            # Copy in 1 MB chunks rather than duplicating the whole upload in memory
+            uploaded_file.seek(0)
+            shutil.copyfileobj(uploaded_file, tmp, length=1024 * 1024)
             temp_path = tmp.name
         
         if st.button("Process"):
@@ -79,18 +89,10 @@ if page == "Import":
                 
                 if output_file:
                     # Read data
-                    import openpyxl
-                    wb = openpyxl.load_workbook(output_file)
-                    sheet = wb['Daily New']
-                    
-                    data = []
-                    headers = [cell.value for cell in sheet[1]]
-                    for row in sheet.iter_rows(min_row=2, values_only=True):
-                        if any(row):
-                            data.append(row)
-                    
-                    df = pd.DataFrame(data, columns=headers)
-                    wb.close()
+                    # Object dtype keeps cell values as written; empty cells become None as before
+                    df = pd.read_excel(output_file, sheet_name='Daily New', engine='openpyxl', dtype=object)
+                    df = df.dropna(how='all')
+                    df = df.where(df.notna(), None)
                     
                     # Save to database
                     save_bugs_to_db(df)
@@ -10,6 +10,7 @@ import pandas as pd
 import sqlite3
 import os
 import tempfile
+import shutil
 import re
 import requests
 from datetime import datetime, timedelta
@@ -312,7 +313,9 @@ if page == "📥 Import Bugs":
     
     if uploaded_file:
         with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp:
-            tmp.write(uploaded_file.getvalue())
+            # Copy in 1 MB chunks rather than duplicating the whole upload in memory
+            uploaded_file.seek(0)
+            shutil.copyfileobj(uploaded_file, tmp, length=1024 * 1024)
             temp_path = tmp.name
         
         try:
@@ -325,18 +328,10 @@ if page == "📥 Import Bugs":
                         
                         if output_file and os.path.exists(output_file):
                             # Read processed data
-                            import openpyxl
-                            wb = openpyxl.load_workbook(output_file)
-                            sheet = wb['Daily New']
-                            
-                            data = []
-                            headers = [cell.value for cell in sheet[1]]
-                            for row in sheet.iter_rows(min_row=2, values_only=True):
-                                if any(row):
-                                    data.append(row)
-                            
-                            df = pd.DataFrame(data, columns=headers)
-                            wb.close()
+                            # Object dtype keeps cell values as written; empty cells become None as before
+                            df = pd.read_excel(output_file, sheet_name='Daily New', engine='openpyxl', dtype=object)
+                            df = df.dropna(how='all')
+                            df = df.where(df.notna(), None)
                             
                             # Save to database with enhanced features
                             new_bugs, updated_bugs = save_bugs_to_db(df)
@@ -529,11 +524,11 @@ elif page == "📅 History":
     days_back = st.slider("Days to look back", 1, 30, 7)
     
     conn = sqlite3.connect(DB_FILE)
-    history_df = pd.read_sql_query(f'''
+    history_df = pd.read_sql_query('''
         SELECT * FROM import_history 
-        WHERE import_date >= date('now', '-{days_back} days')
+        WHERE import_date >= date('now', ?)
         ORDER BY import_date DESC
-    ''', conn)
+    ''', conn, params=(f'-{int(days_back)} days',))
     conn.close()
     
     if not history_df.empty:
@@ -736,11 +731,11 @@ elif page == "✅ Completed":
             assignee_filter = st.selectbox("Filter by assignee:", ["All"] + TEAM_MEMBERS)
         
         # Filter completed bugs
-        query = f'''
+        query = '''
             SELECT * FROM completed_bugs 
-            WHERE completed_date >= date('now', '-{days_filter} days')
+            WHERE completed_date >= date('now', ?)
         '''
-        params = []
+        params = [f'-{int(days_filter)} days']
         
         if assignee_filter != "All":
             query += ' AND assignee_detected = ?'
@@ -895,11 +890,13 @@ elif page == "⚙️ Settings":
     # Database statistics
     conn = sqlite3.connect(DB_FILE)
     
-    bugs_count = pd.read_sql_query('SELECT COUNT(*) as count FROM bugs', conn).iloc[0]['count']
-    imports_count = pd.read_sql_query('SELECT COUNT(*) as count FROM import_history', conn).iloc[0]['count']
-    progress_count = pd.read_sql_query('SELECT COUNT(*) as count FROM in_progress', conn).iloc[0]['count']
-    completed_count = pd.read_sql_query('SELECT COUNT(*) as count FROM completed_bugs', conn).iloc[0]['count']
-    custom_count = pd.read_sql_query('SELECT COUNT(*) as count FROM custom_bugs', conn).iloc[0]['count']
+    bugs_count, imports_count, progress_count, completed_count, custom_count = conn.execute('''
+        SELECT (SELECT COUNT(*) FROM bugs),
+               (SELECT COUNT(*) FROM import_history),
+               (SELECT COUNT(*) FROM in_progress),
+               (SELECT COUNT(*) FROM completed_bugs),
+               (SELECT COUNT(*) FROM custom_bugs)
+    ''').fetchone()
     
     col1, col2, col3, col4, col5 = st.columns(5)
     with col1: